@@ -1,14 +1,18 @@
 """
 :py:mod:`~indic_transliteration.sanscript` is the most popular submodule here.
 """
-import json
 import os
 
 
-language_code_to_script = {}
-
-with open(os.path.join(os.path.dirname(__file__), "sanscript/schemes/data/language_code_to_script.json")) as f:
-    language_code_to_script = json.load(f)
+def __getattr__(name):
+  # language_code_to_script is loaded on first use, to keep imports fast.
+  if name == "language_code_to_script":
+    import json
+    global language_code_to_script
+    with open(os.path.join(os.path.dirname(__file__), "sanscript/schemes/data/language_code_to_script.json")) as f:
+      language_code_to_script = json.load(f)
+    return language_code_to_script
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 
@@ -34,8 +34,7 @@ def transliterate_tamil(text, dest_script="DEVANAGARI", aksharamukha_pre_options
   text = regex.sub("म्([सव])", r"ं\1", text)
   
   # Mitigate consequences of ऩ ऱ insertions.
-  text = tamil_tools.soften(text=text, pattern="(?<=[ऩ][ा-्]?)({})(?!्)")
-  text = tamil_tools.soften(text=text, pattern="(?<=[ऱ][ा-ौ]?)({})(?!्)")
+  text = tamil_tools.set_tamil_soft_consonants(text=text)
   # text = regex.sub("।", r".", text)
   if dest_script.upper() != "DEVANAGARI":
     text = aksharamukha.transliterate.process(src="DEVANAGARI", tgt=dest_script, txt=text)
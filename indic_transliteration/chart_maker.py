@@ -18,10 +18,8 @@ def get_script_map(scripts, base_script=sanscript.DEVANAGARI):
 
   script_map = []
   for base_letter in base_letters:
-    row = [base_letter]
-    for script in scripts:
-      row.append(sanscript.transliterate(base_letter, _from=base_script, _to=script))
-    script_map.append(row)
+    outputs = sanscript.transliterate_to_many(base_letter, _from=base_script, targets=scripts)
+    script_map.append([base_letter] + [outputs[script] for script in scripts])
   return script_map
 
 
@@ -13,10 +13,6 @@ LOGGER.setLevel(logging.WARNING)
 from urllib3.connectionpool import log as urllibLogger
 urllibLogger.setLevel(logging.WARNING)
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(levelname)s:%(asctime)s:%(module)s:%(lineno)d %(message)s")
-
 
 class DVTTVedicConverter(Converter):
     def set_browser(self, debugger_address=None):
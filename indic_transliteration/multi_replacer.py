@@ -0,0 +1,60 @@
+"""
+Replacement of many substrings in a single pass over the text.
+"""
+import regex
+
+
+class MultiReplacer(object):
+  """Replaces many substrings at once, in a single pass over the text::
+
+      replacer = MultiReplacer({"ch": "c", "chh": "ch"})
+      replacer.replace("chha ch")  # "cha c"
+
+  Where several keys match, the leftmost one is replaced, and of those
+  starting there, the longest. Replacements are not scanned again, so
+  (unlike with a series of :meth:`str.replace` calls) they never cascade.
+
+  :param replacements: a dict from substrings to their replacements
+  """
+
+  def __init__(self, replacements):
+    if "" in replacements:
+      raise ValueError("Can't replace the empty string.")
+    self.replacements = dict(replacements)
+    self._translation_table = None
+    self._pattern = None
+    if all(len(key) == 1 for key in self.replacements):
+      self._translation_table = str.maketrans(self.replacements)
+    else:
+      # Alternatives are tried in order, so the longest key wins.
+      keys = sorted(self.replacements, key=len, reverse=True)
+      self._pattern = regex.compile("|".join(regex.escape(key) for key in keys))
+
+  @classmethod
+  def from_passes(cls, passes):
+    """Make a replacer with the same effect as calling :meth:`str.replace`
+    for each of the (key, value) pairs in `passes` in turn. Each value is run
+    through the later passes here, so that cascades within a replacement are
+    kept.
+
+    This is only equivalent if no key overlaps an earlier, shorter key, and
+    no replacement (or deletion) creates a match for a later key together
+    with the text around it. Passes which do that need separate replacers.
+    """
+    passes = list(passes)
+    replacements = {}
+    for index, (key, value) in enumerate(passes):
+      if key in replacements:
+        # The earlier pass left nothing for this one.
+        continue
+      for (later_key, later_value) in passes[index + 1:]:
+        value = value.replace(later_key, later_value)
+      replacements[key] = value
+    return cls(replacements)
+
+  def replace(self, text):
+    """:return: `text` with all the keys replaced"""
+    if self._translation_table is not None:
+      return text.translate(self._translation_table)
+    replacements = self.replacements
+    return self._pattern.sub(lambda match: replacements[match.group()], text)
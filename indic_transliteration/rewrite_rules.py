@@ -0,0 +1,122 @@
+"""
+Ordered regular expression rewrites, in as few passes over the text as their
+order allows.
+"""
+import regex
+
+# Group references within a pattern, which can't survive its merger with others.
+_GROUP_REFERENCE = regex.compile(r"\\(?:[1-9]|g<)|\(\?(?:P[=>]|[1-9&R])")
+# Templates with nothing but literal text and numbered groups.
+_SIMPLE_TEMPLATE = regex.compile(r"(?:[^\\]|\\[1-9])*")
+_TEMPLATE_GROUP = regex.compile(r"\\([1-9])")
+
+
+class RewriteRules(object):
+  """Rewrites text as a series of :func:`regex.sub` calls would::
+
+      rules = RewriteRules([
+        [("ंऽ", "ऽं")],
+        [("ं( *)([क-ङ])", r"ङ्\\1\\2"), ("ं( *)([प-म])", r"म्\\1\\2")],
+      ])
+      rules.apply("संकल्पं पश्य")  # "सङ्कल्पम् पश्य"
+
+  The rules come in stages, which are applied in turn. The rules of a stage
+  may be merged into one alternation, and so applied together in a single
+  scan: the leftmost match is replaced, and of those starting there, that of
+  the earliest rule. This is only the same as applying them one after another
+  if no two rules' matches overlap, and no replacement makes or unmakes a match
+  (lookarounds included) for a later rule. Rules which interact like that go
+  in separate stages.
+
+  A merged scan saves the fixed cost of a :func:`regex.sub` call per rule, but
+  replaces each match with a Python function, where a single rule with a
+  template is replaced in C. (Factoring out a leading literal which the rules
+  share doesn't help: the search skips ahead to it either way.) So the merged
+  scan pays off only on short texts, such as single words - up to about
+  `MERGED_SCAN_LENGTH_PER_RULE` characters for each rule it saves applying,
+  as measured on the normalizers of this package. Longer texts go through the
+  rules of a stage one at a time, to the same effect.
+
+  A rule may come with a list of rules doing its work one after another, as a
+  third item. These are used instead of it when the rules are applied one at
+  a time: say, literal patterns with templates, which are quicker then than a
+  character class with a function.
+
+  The patterns are compiled when the rules are first applied.
+
+  :param stages: a list of stages, each a list of (pattern, replacement) or
+                 (pattern, replacement, rules) tuples. A replacement is a
+                 template (as for :func:`regex.sub`) or a function of the
+                 match.
+  """
+
+  #: The length of text, per rule saved, up to which a stage is scanned once
+  MERGED_SCAN_LENGTH_PER_RULE = 20
+
+  def __init__(self, stages):
+    self.stages = [list(stage) for stage in stages if stage]
+    self._compiled_stages = None
+
+  @staticmethod
+  def _compile_stage(stage):
+    """:return: a (pattern, replacement) pair doing the work of the rules in
+             `stage` in a single :meth:`regex.Pattern.sub` call"""
+    if len(stage) == 1:
+      ((pattern, replacement, *_),) = stage
+      return (regex.compile(pattern), replacement)
+    rules = {}
+    alternatives = []
+    group = 1
+    for pattern, replacement, *_ in stage:
+      if _GROUP_REFERENCE.search(pattern):
+        raise ValueError("Can't merge %r with other rules, since it refers to its groups." % pattern)
+      pattern = regex.compile(pattern)
+      if callable(replacement) or not _SIMPLE_TEMPLATE.fullmatch(replacement):
+        # Matched again on its own, for groups numbered as in the rule.
+        rules[group] = (pattern, replacement)
+      else:
+        # The template's groups, renumbered to those of the merged pattern.
+        parts = _TEMPLATE_GROUP.split(replacement)
+        parts[1::2] = [group + int(part) for part in parts[1::2]]
+        rules[group] = (None, [part for part in parts if part != ""])
+      alternatives.append("(%s)" % pattern.pattern)
+      group += 1 + pattern.groups
+
+    def replace(match):
+      # The group of the rule is closed last.
+      pattern, replacement = rules[match.lastindex]
+      if pattern is None:
+        return "".join([part if part.__class__ is str else (match.group(part) or "") for part in replacement])
+      rule_match = pattern.match(match.string, match.start())
+      if callable(replacement):
+        return replacement(rule_match)
+      return rule_match.expand(replacement)
+
+    return (regex.compile("|".join(alternatives)), replace)
+
+  def _compile(self):
+    """:return: for each stage, the length of the longest text to scan once,
+             the pass doing so, and the passes applying the rules one at a
+             time"""
+    compiled_stages = []
+    for stage in self.stages:
+      passes = []
+      for pattern, replacement, *sequential_rules in stage:
+        rules = sequential_rules[0] if sequential_rules else [(pattern, replacement)]
+        passes.extend((regex.compile(x), y) for (x, y) in rules)
+      max_merged_length = self.MERGED_SCAN_LENGTH_PER_RULE * (len(passes) - 1)
+      compiled_stages.append((max_merged_length, self._compile_stage(stage) if max_merged_length > 0 else None, passes))
+    return compiled_stages
+
+  def apply(self, text):
+    """:return: `text`, rewritten by all the rules"""
+    if self._compiled_stages is None:
+      self._compiled_stages = self._compile()
+    for max_merged_length, merged_pass, passes in self._compiled_stages:
+      if len(text) <= max_merged_length:
+        pattern, replacement = merged_pass
+        text = pattern.sub(replacement, text)
+      else:
+        for pattern, replacement in passes:
+          text = pattern.sub(replacement, text)
+    return text
@@ -3,20 +3,26 @@ Deal with the idiosyncratic transliteration scheme used by "Sacred texts of the
 """
 import logging
 
+from indic_transliteration.multi_replacer import MultiReplacer
+
+
+def _make_replacer(replacements):
+    # Each replacement is also made in capitalized form, right after it.
+    passes = []
+    for x, y in replacements.items():
+        passes.extend([(x, y), (x.capitalize(), y.capitalize())])
+    return MultiReplacer.from_passes(passes)
+
+
+_ITALICIZED_REPLACER = _make_replacer({"n": "ṇ", "t": "ṭ", "d": "ḍ", "m": "ṁ", "kh": "ch", "h": "ḥ", "ri": "r̥", "k": "c", "g": "j", "s": "ś"}) # sh not intalicized is ṣ
+_NONITALICIZED_REPLACER = _make_replacer({"â": "ā", "î": "ī", "û": "ū", "": "\\`", "": " - ", " ": " "})
+
 
 def decode_italicized_text(text):
     if len(text) > 2:
         logging.warning("Beware! usually not an encoded sanskrit text")
-    replacements = {"n": "ṇ", "t": "ṭ", "d": "ḍ", "m": "ṁ", "kh": "ch", "h": "ḥ", "ri": "r̥", "k": "c", "g": "j", "s": "ś"} # sh not intalicized is ṣ
-    for x, y in replacements.items():
-        text = text.replace(x, y)
-        text = text.replace(x.capitalize(), y.capitalize())
-    return text
+    return _ITALICIZED_REPLACER.replace(text)
 
 
 def decode_nonitalicized(text):
-  replacements = {"â": "ā", "î": "ī", "û": "ū", "": "\\`", "": " - ", " ": " "}
-  for x, y in replacements.items():
-    text = text.replace(x, y)
-    text = text.replace(x.capitalize(), y.capitalize())
-  return text
\ No newline at end of file
+  return _NONITALICIZED_REPLACER.replace(text)
\ No newline at end of file
@@ -57,18 +57,26 @@ Some of these variables are documented below.
 
 from __future__ import unicode_literals
 
+import collections
+import functools
+import itertools
+import os
+import sys
+import threading
+
+import regex
+
 # Brahmic schemes
 # ---------------
 #: Internal name of Bengali. Bengali ``ba`` and ``va`` are both rendered
 #: as `ব`.
+from indic_transliteration.sanscript.schemes import LazySchemeMap
 from indic_transliteration.sanscript.schemes import Scheme
 from indic_transliteration.sanscript.schemes import roman
 from indic_transliteration.sanscript.schemes import brahmic
-
-try:
-    from functools import lru_cache
-except ImportError:
-    from backports.functools_lru_cache import lru_cache
+from indic_transliteration.sanscript.brahmic_mapper import _brahmic, _analyze_brahmic, _render_brahmic, _translate_batch
+from indic_transliteration.sanscript.brahmic_mapper import _OTHER_CLASS, _CONSONANT_CLASS, _VOWEL_MARK_CLASS, _VIRAMA_CLASS
+from indic_transliteration.sanscript.roman_mapper import _roman, _analyze_roman, _render_roman
 
 # These variables are replicated here for backward compatibility.
 # -------------
@@ -100,9 +108,28 @@ VELTHUIS = roman.VELTHUIS
 WX = roman.WX
 
 ## NOTE: See the Scheme constructor documentation for a few general notes while defining schemes.
-SCHEMES = {}
-SCHEMES.update(roman.SCHEMES)
-SCHEMES.update(brahmic.SCHEMES)
+SCHEMES = LazySchemeMap()
+SCHEMES.update_lazily(roman.SCHEMES)
+SCHEMES.update_lazily(brahmic.SCHEMES)
+
+# Normalizations of the source text, for Brahmic source schemes.
+_SOURCE_PREPROCESSORS = {
+  brahmic.GURMUKHI: brahmic.GurmukhiScheme.replace_addak,
+  brahmic.BENGALI: brahmic.BengaliScheme.replace_khanda,
+  brahmic.TELUGU: brahmic.TeluguScheme.replace_n,
+  brahmic.KANNADA: brahmic.KannadaScheme.replace_n,
+  brahmic.TAMIL_SUB: brahmic.TamilScheme.move_before_maatraa_subscripts,
+  brahmic.TAMIL_SUP: brahmic.TamilScheme.move_before_maatraa_superscripts,
+}
+
+# How many code points of the source block may break the shared layout of
+# the blocks of a layout-compatible scheme map.
+_MAX_LAYOUT_IRREGULARITIES = 16
+
+# The largest gap between the code points of a cluster of source characters,
+# which is covered by the per code point tables of a scheme map.
+_MAX_CODE_POINT_GAP = 1024
+
 
 class SchemeMap(object):
   """Maps one :class:`Scheme` to another. This class grabs the metadata and
@@ -168,6 +195,379 @@ class SchemeMap(object):
         self.vowels[accented_vowel] = self.vowels[base_vowel] + target_accent
         self.non_marks_viraama.update(self.vowels)
 
+    if from_scheme.is_roman:
+      self.token_trie = self._make_token_trie(self.non_marks_viraama, self.max_key_length_from_scheme)
+
+    self.translation_table = None
+    self.code_point_outputs = None
+    self.irregular_tokens = frozenset()
+    self.irregular_token_pattern = None
+    if not from_scheme.is_roman and not to_scheme.is_roman:
+      self._make_translation()
+    elif not from_scheme.is_roman:
+      self._make_code_point_tables()
+    elif to_scheme.is_roman and self.virama.get('') == '':
+      self._make_direct_translation()
+    elif from_scheme.is_single_character:
+      self._make_character_tables()
+    self._make_processing_stages()
+
+  @staticmethod
+  def _make_token_trie(tokens, max_token_length):
+    """Build a prefix trie over `tokens` for longest-match tokenization.
+
+    Each node is a dict from a character to the child node. A node at which
+    some token ends additionally maps `None` to that token. Tokens longer than
+    `max_token_length` are left out, since the transliterators never match them.
+    """
+    trie = {}
+    for token in tokens:
+      if not token or len(token) > max_token_length:
+        continue
+      node = trie
+      for character in token:
+        node = node.setdefault(character, {})
+      node[None] = token
+    return trie
+
+  def _make_translation(self):
+    """Prepare a :meth:`str.translate` table for Brahmic to Brahmic maps.
+
+    Such maps carry no implicit 'a' state, so each source token maps on its
+    own. Most multi-character tokens (like क्ष) map to the same output as their
+    characters would one by one. The rest are "irregular" and are matched by
+    `irregular_token_pattern` before translating the text around them. Regular
+    tokens overlapping an irregular one are matched along with them, so that
+    the text is split into tokens exactly as in :func:`_brahmic`.
+    """
+    def map_character(character):
+      for group_map in (self.vowel_marks, self.virama, self.non_marks_viraama):
+        if character in group_map:
+          return group_map[character]
+      return character
+
+    self.translation_table = {}
+    for group_map in (self.vowel_marks, self.virama, self.non_marks_viraama):
+      for token in group_map:
+        if len(token) == 1:
+          self.translation_table[ord(token)] = map_character(token)
+
+    self._make_irregular_tokens(lambda token: self.non_marks_viraama[token] == "".join(map_character(c) for c in token))
+
+  def _make_irregular_tokens(self, is_regular, single_characters=False):
+    """Find the multi-character source tokens which must be matched as a
+    whole, and set `irregular_tokens` and `irregular_token_pattern`.
+
+    Those for which `is_regular` is false are irregular, and so are regular
+    tokens overlapping an irregular one - so that matching the irregular
+    tokens and taking the rest of the text a character at a time splits it
+    into tokens exactly as longest-match tokenization does.
+
+    :param single_characters: whether single-character tokens may be
+                              irregular too
+    """
+    min_length = 1 if single_characters else 2
+    multi_character_tokens = set(x for x in self.non_marks_viraama if min_length <= len(x) <= self.max_key_length_from_scheme)
+    irregular_tokens = set(x for x in multi_character_tokens if not is_regular(x))
+
+    def overlaps(token, other):
+      return other in token or any(other.startswith(token[i:]) for i in range(1, len(token)))
+
+    regular_tokens = multi_character_tokens - irregular_tokens
+    while True:
+      overlapping_tokens = set(x for x in regular_tokens if any(overlaps(x, y) for y in irregular_tokens))
+      if not overlapping_tokens:
+        break
+      irregular_tokens.update(overlapping_tokens)
+      regular_tokens -= overlapping_tokens
+
+    self.irregular_tokens = frozenset(irregular_tokens)
+    if irregular_tokens:
+      # Longer alternatives come first so that the longest token wins.
+      pattern = "|".join(regex.escape(x) for x in sorted(irregular_tokens, key=len, reverse=True))
+      self.irregular_token_pattern = regex.compile("(%s)" % pattern)
+
+  @staticmethod
+  def _get_code_point_range(characters):
+    """:return: the first and the last code point of the largest cluster of
+             code points of `characters`, split at gaps of more than
+             _MAX_CODE_POINT_GAP"""
+    clusters = []
+    for code_point in sorted(ord(x) for x in characters):
+      if clusters and code_point - clusters[-1][-1] <= _MAX_CODE_POINT_GAP:
+        clusters[-1].append(code_point)
+      else:
+        clusters.append([code_point])
+    cluster = max(clusters, key=len) if clusters else [0]
+    return cluster[0], cluster[-1]
+
+  def _make_code_point_tables(self):
+    """Prepare the per code point tables read by :func:`_brahmic`, for
+    Brahmic to Roman maps.
+
+    For each source character, `code_point_outputs` has its output,
+    `code_point_classes` its token class (consonant, vowel mark, virama or
+    other) and `code_point_token_lengths` the length of the longest
+    multi-character token starting with it (or 0). These are indexed by code
+    point less `code_point_offset`, and cover the largest cluster of code
+    points of the source characters. Characters outside it are looked up in
+    `other_code_points`, which maps them to (output, class, token length)
+    triples, or else taken as themselves.
+    """
+    def get_entry(character):
+      if character in self.vowel_marks:
+        return self.vowel_marks[character], _VOWEL_MARK_CLASS
+      if character in self.virama:
+        return self.virama[character], _VIRAMA_CLASS
+      token_class = _CONSONANT_CLASS if self.to_scheme.is_roman and character in self.consonants else _OTHER_CLASS
+      return self.non_marks_viraama.get(character, character), token_class
+
+    token_lengths = {}
+    for token in self.non_marks_viraama:
+      if 1 < len(token) <= self.max_key_length_from_scheme:
+        token_lengths[token[0]] = max(token_lengths.get(token[0], 0), len(token))
+    characters = set(x for group_map in (self.vowel_marks, self.virama, self.non_marks_viraama) for x in group_map if len(x) == 1)
+    characters.update(token_lengths)
+
+    first, last = self._get_code_point_range(characters)
+    self.code_point_offset = first
+    self.code_point_outputs = []
+    code_point_classes = []
+    code_point_token_lengths = []
+    for code_point in range(first, last + 1):
+      output, token_class = get_entry(chr(code_point))
+      self.code_point_outputs.append(output)
+      code_point_classes.append(token_class)
+      code_point_token_lengths.append(token_lengths.get(chr(code_point), 0))
+    self.code_point_classes = bytes(code_point_classes)
+    self.code_point_token_lengths = bytes(code_point_token_lengths)
+    self.other_code_points = dict((x, get_entry(x) + (token_lengths.get(x, 0),)) for x in characters
+                                  if not first <= ord(x) <= last)
+
+  def _make_character_tables(self):
+    """Prepare the tables read by :func:`_roman_characters`, for maps from
+    Roman schemes which write each letter with a single character (see
+    :attr:`Scheme.is_single_character`).
+
+    Irregular multi-character tokens - those which don't map as their
+    characters would one by one - are matched by `irregular_token_pattern`.
+    For the other characters, `code_point_outputs` has the output after
+    anything but a consonant, `code_point_outputs_after_consonant` that after
+    a consonant and `code_point_classes` whether the character is a
+    consonant. These are indexed by code point less `code_point_offset`.
+    Characters outside them are looked up in `other_code_points`, which maps
+    them to (output, output after a consonant, class) triples, or else taken
+    as themselves.
+    """
+    virama = self.virama['']
+
+    def get_entry(token):
+      if token not in self.non_marks_viraama:
+        return token, virama + token, _OTHER_CLASS
+      output = self.non_marks_viraama[token]
+      if token in self.vowels:
+        output_after_consonant = self.vowel_marks.get(token, '') or (self.vowels[token] if self.to_scheme.is_roman else '')
+      else:
+        output_after_consonant = virama + output
+      return output, output_after_consonant, _CONSONANT_CLASS if token in self.consonants else _OTHER_CLASS
+
+    def is_regular(token):
+      # The token must map as its characters do one by one, after a
+      # consonant or not, and leave the same state behind.
+      entry = get_entry(token)
+      for had_consonant in (False, True):
+        output = entry[had_consonant]
+        character_outputs = []
+        for character in token:
+          character_entry = get_entry(character)
+          character_outputs.append(character_entry[had_consonant])
+          had_consonant = character_entry[2] == _CONSONANT_CLASS
+        if "".join(character_outputs) != output or had_consonant != (entry[2] == _CONSONANT_CLASS):
+          return False
+      return True
+
+    self._make_irregular_tokens(is_regular)
+    characters = set(x for x in self.non_marks_viraama if len(x) == 1)
+    first, last = self._get_code_point_range(characters)
+    self.code_point_offset = first
+    entries = [get_entry(chr(x)) for x in range(first, last + 1)]
+    self.code_point_outputs = [x[0] for x in entries]
+    self.code_point_outputs_after_consonant = [x[1] for x in entries]
+    self.code_point_classes = bytes(x[2] for x in entries)
+    self.other_code_points = dict((x, get_entry(x)) for x in characters if not first <= ord(x) <= last)
+
+  def _make_direct_translation(self):
+    """Prepare a direct map from source tokens to destination tokens, for
+    Roman to Roman maps (whose virama is written as nothing).
+
+    Such maps need no implicit 'a' state but for a few tokens, like the
+    accented vowels of IAST, which are written otherwise after a consonant.
+    Those, and the multi-character tokens which don't map as their
+    characters would one by one, are matched by `irregular_token_pattern`
+    and mapped with `irregular_token_outputs` - a dict from each of them to
+    its output, its output after a consonant and whether it is a consonant.
+    The text around them is mapped with :meth:`str.translate`.
+    """
+    def get_entry(token):
+      if token not in self.non_marks_viraama:
+        return token, token, False
+      output = self.non_marks_viraama[token]
+      if token in self.vowels:
+        output_after_consonant = self.vowel_marks.get(token, '') or self.vowels[token]
+      else:
+        output_after_consonant = output
+      return output, output_after_consonant, token in self.consonants
+
+    def is_regular(token):
+      # The token must map as its characters do one by one, whatever
+      # precedes, and leave the same state behind.
+      output, output_after_consonant, is_consonant = get_entry(token)
+      character_entries = [get_entry(x) for x in token]
+      return (output == output_after_consonant and all(x[0] == x[1] for x in character_entries) and
+              "".join(x[0] for x in character_entries) == output and character_entries[-1][2] == is_consonant)
+
+    self._make_irregular_tokens(is_regular, single_characters=True)
+    self.irregular_token_outputs = dict((x, get_entry(x)) for x in self.irregular_tokens)
+    self.translation_table = dict((ord(x), get_entry(x)[0]) for x in self.non_marks_viraama
+                                  if len(x) == 1 and x not in self.irregular_tokens)
+
+  def _make_processing_stages(self):
+    """Set up the steps to be run on the text before and after the mapping
+    itself, as lists of functions from text to text with any patterns
+    compiled once here."""
+    from_scheme = self.from_scheme
+    to_scheme = self.to_scheme
+    self.preprocessors = []
+    self.postprocessors = []
+    if not from_scheme.is_roman:
+      if from_scheme.name in _SOURCE_PREPROCESSORS:
+        self.preprocessors.append(_SOURCE_PREPROCESSORS[from_scheme.name])
+      if to_scheme.is_roman and len(self.accents) > 0:
+        # Accents are moved before the yogavaahas they follow.
+        pattern = "([%s])([%s])" % ("".join(from_scheme['yogavaahas']), "".join(self.accents.keys()))
+        self.preprocessors.append(functools.partial(regex.compile(pattern).sub, "\\2\\1"))
+    else:
+      if not to_scheme.is_roman and len(self.accents) > 0:
+        # Yogavaahas are moved before the accents they follow.
+        pattern = "([%s])([%s])" % ("".join(self.accents.values()), "".join(to_scheme['yogavaahas']))
+        self.postprocessors.append(functools.partial(regex.compile(pattern).sub, "\\2\\1"))
+      if from_scheme.name in roman.CAPITALIZABLE_SCHEME_IDS:
+        self.postprocessors.append(to_scheme.fix_om)
+
+  @functools.cached_property
+  def splits_at_whitespace(self):
+    """Whether transliterating a text comes to the same as transliterating
+    its words (runs of non-whitespace) one by one and keeping the whitespace
+    between them. The implicit 'a' ends at whitespace, and so this is the
+    case unless a token, shortcut or the like of either scheme has whitespace
+    in it."""
+    def get_strings(scheme):
+      for group in scheme.values():
+        if isinstance(group, dict):
+          for key, value in group.items():
+            yield key
+            if isinstance(value, str):
+              yield value
+            elif isinstance(value, list):
+              yield from value
+    strings = itertools.chain(get_strings(self.from_scheme), get_strings(self.to_scheme))
+    return not any(_WHITESPACE_PATTERN.search(x) for x in strings if isinstance(x, str))
+
+  @functools.cached_property
+  def _analysis_key(self):
+    """What the analysis of a text by :func:`_analyze_roman` or
+    :func:`_analyze_brahmic` depends on. Scheme maps with the same key (and
+    source scheme) share analyses."""
+    if self.from_scheme.is_roman:
+      return (frozenset(self.non_marks_viraama), frozenset(self.vowels), frozenset(self.consonants))
+    to_roman = self.to_scheme.is_roman
+    return (to_roman, frozenset(self.non_marks_viraama), frozenset(self.vowel_marks), frozenset(self.virama),
+            frozenset(self.consonants) if to_roman else None)
+
+  @functools.cached_property
+  def is_layout_compatible(self):
+    """Whether this is a Brahmic to Brahmic map between Unicode blocks which
+    share the ISCII-derived layout: but for a few irregular code points, each
+    letter of the source block maps to the letter at the same offset in one
+    block of the destination. Batches of texts are then mapped with the
+    lookup arrays of :attr:`_block_lookups` (see :func:`_translate_batch`)."""
+    if self.from_scheme.is_roman or self.translation_table is None:
+      return False
+    source_block = collections.Counter(x >> 7 for x in self.translation_table).most_common(1)[0][0]
+    source_items = [(x, y) for x, y in self.translation_table.items() if x >> 7 == source_block]
+    target_blocks = collections.Counter(ord(y) >> 7 for x, y in source_items if len(y) == 1)
+    if not target_blocks:
+      return False
+    target_block = target_blocks.most_common(1)[0][0]
+    # Letters shared by the scripts (like the dandas) keep their code points.
+    irregular_count = sum(1 for x, y in source_items if y != chr(x) and y != chr((target_block << 7) | (x & 127)))
+    return irregular_count <= _MAX_LAYOUT_IRREGULARITIES
+
+  @functools.cached_property
+  def _block_lookups(self):
+    """The translation table as a dict from each block of 128 code points
+    with source letters (or characters of irregular tokens) to a list of the
+    128 code points they map to. Characters not in the table map to
+    themselves, and those which map to other than a single character, to -1."""
+    block_lookups = {}
+    for code_point in itertools.chain(self.translation_table, (ord(x) for x in "".join(self.irregular_tokens))):
+      block = code_point >> 7
+      if block not in block_lookups:
+        block_lookups[block] = list(range(block << 7, (block + 1) << 7))
+    for source, target in self.translation_table.items():
+      block_lookups[source >> 7][source & 127] = ord(target) if len(target) == 1 else -1
+    return block_lookups
+
+  @functools.cached_property
+  def _block_token_flags(self):
+    """A dict from each block of :attr:`_block_lookups` to a list of 128
+    flags: 1 for the code points which start an irregular token, and 2 for
+    those which end one."""
+    block_token_flags = dict((x, [0] * 128) for x in self._block_lookups)
+    for token in self.irregular_tokens:
+      for code_point, flag in ((ord(token[0]), 1), (ord(token[-1]), 2)):
+        block_token_flags[code_point >> 7][code_point & 127] |= flag
+    return block_token_flags
+
+  @functools.cached_property
+  def _brahmic_token_pattern(self):
+    """A pattern matching the tokens of a Brahmic source text, one after
+    another - the longest source token at each point, or else a single
+    character - as :func:`_brahmic` finds them."""
+    tokens = [x for x in self.non_marks_viraama if 1 < len(x) <= self.max_key_length_from_scheme]
+    alternatives = [regex.escape(x) for x in sorted(tokens, key=len, reverse=True)] + ["."]
+    return regex.compile("|".join(alternatives), regex.DOTALL)
+
+  @functools.cached_property
+  def _token_start_characters(self):
+    """The characters with which source tokens start."""
+    return frozenset(x[0] for group_map in (self.vowel_marks, self.virama, self.non_marks_viraama) for x in group_map if x)
+
+  @functools.cached_property
+  def _non_token_run_pattern(self):
+    """A pattern matching runs of characters which start no source token -
+    like Latin text, digits or markup in a Brahmic text. :func:`_brahmic` and
+    :func:`_roman` copy such runs with a single slice."""
+    return regex.compile("[^%s]+" % "".join(regex.escape(x) for x in sorted(self._token_start_characters)))
+
+  def __getstate__(self):
+    # Packaged schemes are stored by name, which keeps pickles small and
+    # quick to load. The processing stages refer to the schemes as well, and
+    # are made afresh.
+    state = dict(self.__dict__)
+    del state["preprocessors"], state["postprocessors"]
+    for key in ("from_scheme", "to_scheme"):
+      scheme = state[key]
+      if scheme.name is not None and SCHEMES.get(scheme.name) is scheme:
+        state[key] = scheme.name
+    return state
+
+  def __setstate__(self, state):
+    for key in ("from_scheme", "to_scheme"):
+      if not isinstance(state[key], Scheme):
+        state[key] = SCHEMES[state[key]]
+    self.__dict__.update(state)
+    self._make_processing_stages()
 
   def __str__(self):
     import pprint
@@ -177,7 +577,362 @@ class SchemeMap(object):
                            "consonants": self.consonants})
 
 
-@lru_cache(maxsize=8)
+#: Statistics of a :class:`SchemeMapCache`, as returned by
+#: :meth:`SchemeMapCache.cache_info`.
+SchemeMapCacheInfo = collections.namedtuple("SchemeMapCacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize", "pinned"])
+
+
+class SchemeMapCache(object):
+  """A least-recently-used cache of :class:`SchemeMap` objects, keyed by
+  pairs of scheme names. Building a scheme map is the expensive part of a
+  cold :func:`transliterate` call, so callers who use many pairs may want to
+  enlarge the cache, warm it up in advance or pin some pairs::
+
+      scheme_map_cache.resize(128)
+      scheme_map_cache.prewarm([(HK, DEVANAGARI), (HK, KANNADA)], pin=True)
+
+  Pinned pairs are never evicted and don't count towards `maxsize`.
+
+  If a `directory` is given, scheme maps are also pickled there, so that
+  later processes can load them instead of building them again. The files
+  are kept in a subdirectory named after a hash of the library version and
+  the scheme data files, so they are not used once either changes. Scheme
+  maps of schemes modified at runtime are not detected as stale.
+
+  :param maxsize: the number of unpinned scheme maps to keep. If None, the
+                  cache is unbounded.
+  :param directory: the directory for the persistent cache, if any
+  """
+
+  def __init__(self, maxsize=64, directory=None):
+    self.maxsize = maxsize
+    self.directory = directory
+    self._versioned_directory = None
+    self._scheme_maps = collections.OrderedDict()
+    self._pinned = {}
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get(self, input_encoding, output_encoding):
+    """Get the :class:`SchemeMap` from `input_encoding` to `output_encoding`,
+    building it if it is not cached.
+
+    :param input_encoding: Input encoding. Must be defined in `SCHEMES`.
+    :param output_encoding: Output encoding. Must be defined in `SCHEMES`.
+    """
+    key = (input_encoding, output_encoding)
+    with self._lock:
+      scheme_map = self._pinned.get(key)
+      if scheme_map is None:
+        scheme_map = self._scheme_maps.get(key)
+        if scheme_map is not None:
+          self._scheme_maps.move_to_end(key)
+      if scheme_map is not None:
+        self.hits += 1
+        return scheme_map
+      self.misses += 1
+    # Built outside the lock, so that other pairs are not held up meanwhile.
+    scheme_map = self._load(key)
+    if scheme_map is None:
+      scheme_map = SchemeMap(SCHEMES[input_encoding], SCHEMES[output_encoding])
+      self._store(key, scheme_map)
+    with self._lock:
+      if key not in self._pinned:
+        self._scheme_maps[key] = scheme_map
+        self._evict()
+    return scheme_map
+
+  def prewarm(self, pairs, pin=False):
+    """Build and cache the scheme maps for the given pairs of scheme names.
+
+    :param pairs: an iterable of (input_encoding, output_encoding) pairs
+    :param pin: whether to also pin the pairs
+    """
+    for input_encoding, output_encoding in pairs:
+      if pin:
+        self.pin(input_encoding, output_encoding)
+      else:
+        self.get(input_encoding, output_encoding)
+
+  def pin(self, input_encoding, output_encoding):
+    """Keep the scheme map from `input_encoding` to `output_encoding` in the
+    cache (building it if needed) till it is unpinned."""
+    key = (input_encoding, output_encoding)
+    scheme_map = self.get(input_encoding, output_encoding)
+    with self._lock:
+      self._scheme_maps.pop(key, None)
+      self._pinned[key] = scheme_map
+
+  def unpin(self, input_encoding, output_encoding):
+    """Make a pinned pair an ordinary (most recently used) cache entry."""
+    key = (input_encoding, output_encoding)
+    with self._lock:
+      scheme_map = self._pinned.pop(key, None)
+      if scheme_map is not None:
+        self._scheme_maps[key] = scheme_map
+        self._evict()
+
+  def resize(self, maxsize):
+    """Change `maxsize`, evicting the least recently used entries if needed."""
+    with self._lock:
+      self.maxsize = maxsize
+      self._evict()
+
+  def clear(self):
+    """Remove all entries, pinned ones included, and reset the statistics."""
+    with self._lock:
+      self._scheme_maps.clear()
+      self._pinned.clear()
+      self.hits = self.misses = self.evictions = 0
+
+  def cache_info(self):
+    """:return: a :class:`SchemeMapCacheInfo` with the cache statistics"""
+    with self._lock:
+      return SchemeMapCacheInfo(self.hits, self.misses, self.evictions, self.maxsize,
+                                len(self._scheme_maps) + len(self._pinned), len(self._pinned))
+
+  def _get_path(self, key):
+    if self._versioned_directory is None:
+      self._versioned_directory = os.path.join(self.directory, _get_scheme_data_hash())
+    return os.path.join(self._versioned_directory, "%s__%s.pickle" % key)
+
+  def _load(self, key):
+    if self.directory is None:
+      return None
+    import pickle
+    try:
+      with open(self._get_path(key), "rb") as f:
+        return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+      # Missing or unreadable - it will be built and stored afresh.
+      return None
+
+  def _store(self, key, scheme_map):
+    if self.directory is None:
+      return
+    import pickle
+    import tempfile
+    path = self._get_path(key)
+    try:
+      os.makedirs(os.path.dirname(path), exist_ok=True)
+      # Written to a temporary file first, so that concurrent processes never
+      # read a partial file.
+      fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+      with os.fdopen(fd, "wb") as f:
+        pickle.dump(scheme_map, f, protocol=pickle.HIGHEST_PROTOCOL)
+      os.replace(temp_path, path)
+    except OSError:
+      # The persistent cache is an optimization only.
+      pass
+
+  def _evict(self):
+    if self.maxsize is None:
+      return
+    while len(self._scheme_maps) > self.maxsize:
+      self._scheme_maps.popitem(last=False)
+      self.evictions += 1
+
+
+#: Statistics of a :class:`WordCache`, as returned by :meth:`WordCache.cache_info`.
+WordCacheInfo = collections.namedtuple("WordCacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize", "max_memory", "memory"])
+
+_WHITESPACE_PATTERN = regex.compile(r"\s+")
+_WHITESPACE_SPLIT_PATTERN = regex.compile(r"(\s+)")
+
+
+class WordCache(object):
+  """A least-recently-used cache of transliterated words, keyed by the
+  :class:`SchemeMap` (and so the pair of schemes) and the word. Words recur
+  so much in most texts (verse above all) that, once the cache is warm,
+  transliterating a text mostly comes down to looking its words up::
+
+      output = transliterate(text, HK, DEVANAGARI, memoize_words=True)
+      word_cache.cache_info()
+
+  Words are the runs of non-whitespace, since the implicit 'a' ends at
+  whitespace (but not at all punctuation - a Roman scheme may have a token
+  like ".h"). Words longer than :attr:`MAX_WORD_LENGTH` are not cached.
+
+  :param maxsize: the number of words to keep. If None, only `max_memory`
+                  limits the cache.
+  :param max_memory: a limit on the memory taken by the cached words and
+                     their transliterations, in bytes (as estimated with
+                     :func:`sys.getsizeof`). If None, only `maxsize` limits
+                     the cache.
+  """
+
+  #: The length of the longest word cached
+  MAX_WORD_LENGTH = 64
+  # A rough allowance for the key and the dict entry of a cached word.
+  _ENTRY_OVERHEAD = 160
+
+  def __init__(self, maxsize=2 ** 16, max_memory=2 ** 26):
+    self.maxsize = maxsize
+    self.max_memory = max_memory
+    self._words = collections.OrderedDict()
+    self._lock = threading.Lock()
+    self.memory = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def transliterate(self, data, scheme_map, transliterate_word):
+    """Transliterate `data` word by word, with `transliterate_word` for the
+    words which are not cached yet.
+
+    :param scheme_map: the :class:`SchemeMap` the words are transliterated with
+    :param transliterate_word: a function from a word to its transliteration
+    """
+    # Words alternate with the whitespace between them.
+    pieces = _WHITESPACE_SPLIT_PATTERN.split(data)
+    words = self._words
+    max_word_length = self.MAX_WORD_LENGTH
+    # The indices of the pieces of each word which is not cached.
+    missed_words = {}
+    with self._lock:
+      for index in range(0, len(pieces), 2):
+        word = pieces[index]
+        if not word or len(word) > max_word_length:
+          continue
+        key = (scheme_map, word)
+        result = words.get(key)
+        if result is not None:
+          words.move_to_end(key)
+          self.hits += 1
+          pieces[index] = result
+        elif word in missed_words:
+          # Served by the transliteration of its first occurrence.
+          self.hits += 1
+          missed_words[word].append(index)
+        else:
+          self.misses += 1
+          missed_words[word] = [index]
+
+    # The words are transliterated without holding the lock, so that threads
+    # sharing the cache do so concurrently.
+    for index in range(0, len(pieces), 2):
+      if len(pieces[index]) > max_word_length:
+        pieces[index] = transliterate_word(pieces[index])
+    results = dict((word, transliterate_word(word)) for word in missed_words)
+    for word, indices in missed_words.items():
+      for index in indices:
+        pieces[index] = results[word]
+
+    if results:
+      with self._lock:
+        for word, result in results.items():
+          key = (scheme_map, word)
+          # Another thread may have cached the word meanwhile.
+          if key not in words:
+            words[key] = result
+            self.memory += self._get_entry_size(word, result)
+        self._evict()
+    return "".join(pieces)
+
+  @property
+  def hit_rate(self):
+    """The fraction of the words looked up which were found in the cache"""
+    lookups = self.hits + self.misses
+    return self.hits / lookups if lookups else 0.0
+
+  def resize(self, maxsize=None, max_memory=None):
+    """Change `maxsize` and `max_memory` (those which are given), evicting the
+    least recently used words if needed."""
+    with self._lock:
+      if maxsize is not None:
+        self.maxsize = maxsize
+      if max_memory is not None:
+        self.max_memory = max_memory
+      self._evict()
+
+  def clear(self):
+    """Remove all words, and reset the statistics."""
+    with self._lock:
+      self._words.clear()
+      self.memory = self.hits = self.misses = self.evictions = 0
+
+  def cache_info(self):
+    """:return: a :class:`WordCacheInfo` with the cache statistics"""
+    with self._lock:
+      return WordCacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._words), self.max_memory, self.memory)
+
+  def _get_entry_size(self, word, result):
+    return sys.getsizeof(word) + sys.getsizeof(result) + self._ENTRY_OVERHEAD
+
+  def _evict(self):
+    words = self._words
+    while words and ((self.maxsize is not None and len(words) > self.maxsize) or
+                     (self.max_memory is not None and self.memory > self.max_memory)):
+      (_, word), result = words.popitem(last=False)
+      self.memory -= self._get_entry_size(word, result)
+      self.evictions += 1
+
+  def __getstate__(self):
+    # The words are left behind (say, when a Transliterator is sent to a
+    # worker process); only the limits go along.
+    return self.maxsize, self.max_memory
+
+  def __setstate__(self, state):
+    self.__init__(*state)
+
+
+def _get_scheme_data_hash():
+  """:return: a hash of the library version, the scheme data files and the
+           code of this package - which defines what a pickled
+           :class:`SchemeMap` holds, and may change without the version (as
+           in an editable install)"""
+  import hashlib
+  try:
+    from importlib import metadata
+    version = metadata.version("indic_transliteration")
+  except Exception:
+    version = ""
+  digest = hashlib.sha256(version.encode("utf-8"))
+  package_path = os.path.dirname(__file__)
+  for dir_path, dir_names, file_names in os.walk(package_path):
+    dir_names.sort()
+    for file_name in sorted(file_names):
+      if file_name.endswith((".toml", ".py")):
+        file_path = os.path.join(dir_path, file_name)
+        digest.update(os.path.relpath(file_path, package_path).encode("utf-8"))
+        with open(file_path, "rb") as f:
+          digest.update(f.read())
+  return digest.hexdigest()[:16]
+
+
+def _get_cache_size(variable, default):
+  """:return: the cache size set with the environment `variable` - or None,
+           for an unbounded cache, if it is 0 or "none". Malformed values are
+           warned about, and `default` is used instead."""
+  value = os.environ.get(variable, "").strip()
+  if not value:
+    return default
+  if value.lower() in ("0", "none"):
+    return None
+  if not value.isdigit():
+    import logging
+    logging.warning("Ignoring %s=%r, which is neither a cache size nor 0 or none.", variable, value)
+    return default
+  return int(value)
+
+
+#: The cache used by :func:`transliterate` and :class:`Transliterator`. Its
+#: size can be set with the INDIC_TRANSLITERATION_SCHEME_MAP_CACHE_SIZE
+#: environment variable (0 or none for an unbounded cache), and a directory
+#: for persisting scheme maps across processes with
+#: INDIC_TRANSLITERATION_SCHEME_MAP_CACHE_DIR.
+scheme_map_cache = SchemeMapCache(maxsize=_get_cache_size("INDIC_TRANSLITERATION_SCHEME_MAP_CACHE_SIZE", 64),
+                                  directory=os.environ.get("INDIC_TRANSLITERATION_SCHEME_MAP_CACHE_DIR") or None)
+
+#: The cache used by :func:`transliterate` and :class:`Transliterator` with
+#: ``memoize_words=True``. Its size can be set with the
+#: INDIC_TRANSLITERATION_WORD_CACHE_SIZE environment variable (0 or none for
+#: an unbounded cache).
+word_cache = WordCache(maxsize=_get_cache_size("INDIC_TRANSLITERATION_WORD_CACHE_SIZE", 2 ** 16))
+
+
 def _get_scheme_map(input_encoding, output_encoding):
     """Provides a caching layer on top of `SchemeMap` objects to allow faster
     access to scheme maps we've instantiated once.
@@ -185,10 +940,10 @@ def _get_scheme_map(input_encoding, output_encoding):
     :param input_encoding: Input encoding. Must be defined in `SCHEMES`.
     :param output_encoding: Input encoding. Must be defined in `SCHEMES`.
     """
-    return SchemeMap(SCHEMES[input_encoding], SCHEMES[output_encoding])
+    return scheme_map_cache.get(input_encoding, output_encoding)
 
 
-def transliterate(data, _from=None, _to=None, scheme_map=None, **kw):
+def transliterate(data, _from=None, _to=None, scheme_map=None, memoize_words=False, **kw):
   """Transliterate `data` with the given parameters::
 
       output = transliterate('idam adbhutam', HK, DEVANAGARI)
@@ -208,6 +963,11 @@ def transliterate(data, _from=None, _to=None, scheme_map=None, **kw):
   :param scheme_map: the :class:`SchemeMap` to use. If specified, ignore
                      `_from` and `_to`. If unspecified, create a
                      :class:`SchemeMap` from `_from` to `_to`.
+  :param memoize_words: if true, look the words of `data` up in
+                        :data:`word_cache` (or in the given
+                        :class:`WordCache`), and transliterate only those
+                        not found. Ignored with togglers or suspend tokens,
+                        whose state carries over from word to word.
   """
   options = {
     'togglers': {},
@@ -220,30 +980,375 @@ def transliterate(data, _from=None, _to=None, scheme_map=None, **kw):
     if _from is None:
       from indic_transliteration import detect
       _from = detect.detect(data)
-    maybe_use_dravidian_variant = options.get('maybe_use_dravidian_variant', None)
-    if maybe_use_dravidian_variant == "yes":
-      if _from in ["kannada", "tamil", "telugu", "malayalam"]:
-        dravidian_scheme = _to + "_dravidian"
-        if dravidian_scheme in SCHEMES.keys():
-          _to = dravidian_scheme
-      elif _from in ["optitrans", "itrans", "hk"]:
-        _from = _from + "_dravidian"
-    elif maybe_use_dravidian_variant == "force":
+    _from, _to = _resolve_dravidian_variant(_from, _to, options.get('maybe_use_dravidian_variant', None))
+    scheme_map = _get_scheme_map(_from, _to)
+
+  func = _roman if scheme_map.from_scheme.is_roman else _brahmic
+
+  def transliterate_text(text):
+    text = scheme_map.from_scheme.unapply_shortcuts(data_in=text)
+    result = func(text, scheme_map, **options)
+    return scheme_map.to_scheme.apply_shortcuts(data_in=result)
+
+  cache = _get_word_cache(memoize_words, scheme_map, options)
+  if cache is not None:
+    return cache.transliterate(data, scheme_map, transliterate_text)
+  return transliterate_text(data)
+
+
+def _get_word_cache(memoize_words, scheme_map, options):
+  """:return: the :class:`WordCache` to transliterate with, as asked for by
+           `memoize_words` and allowed by `scheme_map` and the `options`
+           of :func:`transliterate` - or None"""
+  if not memoize_words or not scheme_map.splits_at_whitespace:
+    return None
+  if options.get('togglers') or options.get('suspend_on') or options.get('suspend_off'):
+    return None
+  return memoize_words if isinstance(memoize_words, WordCache) else word_cache
+
+
+@functools.lru_cache(maxsize=None)
+def _is_numpy_available():
+  """:return: whether NumPy (needed by :func:`_translate_batch`) can be
+           imported, without importing it"""
+  import importlib.util
+  return importlib.util.find_spec("numpy") is not None
+
+
+def _resolve_dravidian_variant(_from, _to, maybe_use_dravidian_variant):
+  """Switch to the "_dravidian" variants of the schemes as requested by the
+  `maybe_use_dravidian_variant` option of :func:`transliterate`.
+
+  :return: the (possibly changed) pair of source and destination scheme names
+  """
+  if maybe_use_dravidian_variant == "yes":
+    if _from in ["kannada", "tamil", "telugu", "malayalam"]:
       dravidian_scheme = _to + "_dravidian"
       if dravidian_scheme in SCHEMES.keys():
         _to = dravidian_scheme
-    scheme_map = _get_scheme_map(_from, _to)
+    elif _from in ["optitrans", "itrans", "hk"]:
+      _from = _from + "_dravidian"
+  elif maybe_use_dravidian_variant == "force":
+    dravidian_scheme = _to + "_dravidian"
+    if dravidian_scheme in SCHEMES.keys():
+      _to = dravidian_scheme
+  return _from, _to
 
-  from indic_transliteration.sanscript.brahmic_mapper import _brahmic
-  from indic_transliteration.sanscript.roman_mapper import _roman
-  func = _roman if scheme_map.from_scheme.is_roman else _brahmic
-  data = scheme_map.from_scheme.unapply_shortcuts(data_in=data)
-  result = func(data, scheme_map, **options)
-  result = scheme_map.to_scheme.apply_shortcuts(data_in=result)
-  return result
+
+class Transliterator(object):
+  """Transliterates from one scheme to another with fixed options. Unlike
+  :func:`transliterate`, the schemes, the :class:`SchemeMap` and the options
+  are resolved just once, so that little but the mapping itself remains to be
+  done per call::
+
+      to_devanagari = Transliterator(HK, DEVANAGARI)
+      output = to_devanagari('idam adbhutam')
+
+  Transliterators can be pickled (say, to be sent to worker processes). They
+  are then rebuilt from their scheme names and options.
+
+  :param _from: the source scheme name
+  :param _to: the destination scheme name
+  :param kw: options (`memoize_words` included), as for :func:`transliterate`
+  """
+
+  def __init__(self, _from, _to, **kw):
+    self._from = _from
+    self._to = _to
+    self._kw = kw
+    self.options = {
+      'togglers': {},
+      'suspend_on': set(),
+      'suspend_off': set()
+    }
+    self.options.update(kw)
+    maybe_use_dravidian_variant = self.options.pop('maybe_use_dravidian_variant', None)
+    memoize_words = self.options.pop('memoize_words', False)
+    self.scheme_map = _get_scheme_map(*_resolve_dravidian_variant(_from, _to, maybe_use_dravidian_variant))
+    self._word_cache = _get_word_cache(memoize_words, self.scheme_map, self.options)
+
+    from_scheme = self.scheme_map.from_scheme
+    to_scheme = self.scheme_map.to_scheme
+    self._func = _roman if from_scheme.is_roman else _brahmic
+    self._unapply_shortcuts = from_scheme.unapply_shortcuts if "shortcuts" in from_scheme else None
+    self._apply_shortcuts = to_scheme.apply_shortcuts if "shortcuts" in to_scheme else None
+    self._translates_batches = (self._unapply_shortcuts is None and self._apply_shortcuts is None and
+                                self.scheme_map.is_layout_compatible and _is_numpy_available())
+
+  def __call__(self, data):
+    if self._word_cache is not None:
+      return self._word_cache.transliterate(data, self.scheme_map, self._transliterate_text)
+    return self._transliterate_text(data)
+
+  def transliterate_batch(self, texts):
+    """Transliterate each of `texts`, with NumPy if the scheme map is
+    layout-compatible (see :func:`_translate_batch`).
+
+    :param texts: an iterable of strings
+    :return: the list of transliterated texts
+    """
+    if self._translates_batches:
+      return _translate_batch(texts, self.scheme_map)
+    return [self(text) for text in texts]
+
+  def _transliterate_text(self, data):
+    if self._unapply_shortcuts is not None:
+      data = self._unapply_shortcuts(data_in=data)
+    result = self._func(data, self.scheme_map, **self.options)
+    if self._apply_shortcuts is not None:
+      result = self._apply_shortcuts(data_in=result)
+    return result
+
+  def __getstate__(self):
+    return self._from, self._to, self._kw
+
+  def __setstate__(self, state):
+    _from, _to, kw = state
+    self.__init__(_from, _to, **kw)
+
+
+class StreamTransliterator(object):
+  """Transliterates text which arrives in chunks (for example, blocks read
+  from a large file), with output identical to that of transliterating the
+  whole text at once::
+
+      stream = StreamTransliterator(HK, DEVANAGARI)
+      for chunk in chunks:
+        out_file.write(stream.feed(chunk))
+      out_file.write(stream.flush())
+
+  Text is transliterated up to the last line break seen so far, and the
+  rest is held back till more text arrives. No token spans a line break,
+  and the consonant state resets there just as at the end of the text. So
+  memory use is bounded by the longest line rather than by the whole text.
+
+  Togglers and suspend tokens are not supported, since their state may
+  carry over from one line to the next.
+
+  :param _from: the source scheme name
+  :param _to: the destination scheme name
+  :param kw: options, as for :func:`transliterate`
+  """
+
+  def __init__(self, _from, _to, **kw):
+    if kw.get('togglers') or kw.get('suspend_on') or kw.get('suspend_off'):
+      raise ValueError("Togglers and suspend tokens are not supported when streaming.")
+    self.transliterator = Transliterator(_from, _to, **kw)
+    self._pending_chunks = []
+
+  def feed(self, chunk):
+    """Add `chunk` to the stream.
+
+    :return: the transliteration of the text up to the last line break so
+             far, which may be empty
+    """
+    line_end = chunk.rfind("\n") + 1
+    if line_end == 0:
+      self._pending_chunks.append(chunk)
+      return ""
+    self._pending_chunks.append(chunk[:line_end])
+    text = "".join(self._pending_chunks)
+    self._pending_chunks = [chunk[line_end:]]
+    return self.transliterator(text)
+
+  def flush(self):
+    """End the stream.
+
+    :return: the transliteration of the text held back so far
+    """
+    text = "".join(self._pending_chunks)
+    self._pending_chunks = []
+    return self.transliterator(text)
+
+
+def iter_transliterate(chunks, _from, _to, **kw):
+  """Transliterate text arriving as an iterable of `chunks`, such as an open
+  file. Transliterated pieces are yielded as soon as whole lines are
+  available, and they add up to the transliteration of the whole text. See
+  :class:`StreamTransliterator`.
+
+  :param chunks: an iterable of strings
+  :param _from: the source scheme name
+  :param _to: the destination scheme name
+  :param kw: options, as for :func:`transliterate`
+  """
+  stream = StreamTransliterator(_from, _to, **kw)
+  for chunk in chunks:
+    output = stream.feed(chunk)
+    if output:
+      yield output
+  output = stream.flush()
+  if output:
+    yield output
+
+
+def transliterate_file(src, dst, _from, _to, jobs=None, chunk_size=2 ** 22, **kw):
+  """Transliterate the UTF-8 text file at `src` into a file at `dst`, using
+  several processes::
+
+      transliterate_file('in.txt', 'out.txt', HK, DEVANAGARI, jobs=8)
+
+  The input is memory-mapped and split at line breaks (which are safe
+  boundaries, as explained for :class:`StreamTransliterator`) into chunks
+  of about `chunk_size` bytes. The chunks are transliterated by a pool of
+  `jobs` worker processes, and the results are written out in order. Line
+  endings are preserved.
+
+  Togglers and suspend tokens are not supported, since their state would
+  reset at the chunk boundaries.
+
+  :param jobs: the number of worker processes. By default, as many as there
+               are processors. With 1, everything runs in this process.
+  :param kw: options, as for :func:`transliterate`
+  """
+  import mmap
+  if kw.get('togglers') or kw.get('suspend_on') or kw.get('suspend_off'):
+    raise ValueError("Togglers and suspend tokens are not supported when transliterating files.")
+  transliterator = Transliterator(_from, _to, **kw)
+  with open(src, "rb") as in_file:
+    size = os.fstat(in_file.fileno()).st_size
+    spans = []
+    if size > 0:
+      with mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+          end = data.find(b"\n", min(start + chunk_size, size) - 1) + 1 or size
+          spans.append((start, end))
+          start = end
+
+  with open(dst, "w", encoding="utf-8", newline="") as out_file:
+    if jobs == 1:
+      for start, end in spans:
+        out_file.write(_transliterate_file_span(src, start, end, transliterator))
+      return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+      starts, ends = [x[0] for x in spans], [x[1] for x in spans]
+      outputs = executor.map(_transliterate_file_span, itertools.repeat(src), starts, ends, itertools.repeat(transliterator))
+      for output in outputs:
+        out_file.write(output)
+
+
+def _transliterate_file_span(path, start, end, transliterator):
+  """Transliterate bytes `start` to `end` of the file at `path`. Used by
+  :func:`transliterate_file` in its worker processes."""
+  import mmap
+  with open(path, "rb") as in_file, mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+    text = data[start:end].decode("utf-8")
+  return transliterator(text)
+
+
+def transliterate_many(texts, _from=None, _to=None, deduplicate=False, **kw):
+  """Transliterate each of `texts` with the given parameters::
+
+      outputs = transliterate_many(['rAmaH', 'kRSNaH'], HK, DEVANAGARI)
+
+  Options are as for :func:`transliterate`, but they are resolved just once
+  for the whole batch (see :class:`Transliterator`). If `_from` is
+  unspecified, the scheme of each text is detected separately. Between
+  Brahmic schemes whose Unicode blocks share a layout (like Devanagari,
+  Kannada, Telugu and Malayalam), the batch is mapped at once with NumPy, if
+  it is installed.
+
+  :param texts: an iterable of strings
+  :param deduplicate: if true, transliterate repeated texts just once
+  :return: the list of transliterated texts, in the order of `texts`
+  """
+  if _from is not None:
+    transliterator = Transliterator(_from, _to, **kw)
+    if transliterator._translates_batches:
+      texts = list(texts)
+      if not deduplicate:
+        return transliterator.transliterate_batch(texts)
+      unique_texts = list(dict.fromkeys(texts))
+      results = dict(zip(unique_texts, transliterator.transliterate_batch(unique_texts)))
+      return [results[text] for text in texts]
+    transliterate_one = transliterator
+  else:
+    from indic_transliteration import detect
+    transliterators = {}
+
+    def transliterate_one(text):
+      text_from = detect.detect(text)
+      transliterator = transliterators.get(text_from)
+      if transliterator is None:
+        transliterator = transliterators[text_from] = Transliterator(text_from, _to, **kw)
+      return transliterator(text)
+
+  if not deduplicate:
+    return [transliterate_one(text) for text in texts]
+  results = {}
+  outputs = []
+  for text in texts:
+    result = results.get(text)
+    if result is None:
+      result = results[text] = transliterate_one(text)
+    outputs.append(result)
+  return outputs
+
+
+def transliterate_to_many(data, _from, targets, **kw):
+  """Transliterate `data` into each of the `targets` schemes::
+
+      outputs = transliterate_to_many('rAmaH', HK, [DEVANAGARI, KANNADA, IAST])
+      outputs[KANNADA]  # 'ರಾಮಃ'
+
+  The text is tokenized and its tokens classified (as consonants, vowels,
+  marks and so on) once, and the output for each target is rendered from
+  that analysis. Targets which tokenize the text differently (say, since
+  they lack a letter of the source scheme) get analyses of their own.
+  Brahmic to Brahmic maps, which need no analysis, are done as usual, and
+  so is everything with other options, such as togglers or suspend tokens.
+
+  :param _from: the source scheme name. If None, it is detected.
+  :param targets: an iterable of destination scheme names
+  :param kw: options, as for :func:`transliterate`
+  :return: a dict from each of the `targets` to the transliteration of `data`
+  """
+  if _from is None:
+    from indic_transliteration import detect
+    _from = detect.detect(data)
+  kw.pop('memoize_words', None)
+  maybe_use_dravidian_variant = kw.pop('maybe_use_dravidian_variant', None)
+  if kw:
+    # transliterate accepts (or rejects) these as the schemes require.
+    return dict((_to, transliterate(data, _from, _to, maybe_use_dravidian_variant=maybe_use_dravidian_variant, **kw))
+                for _to in targets)
+
+  source_texts = {}
+  analyses = {}
+  results = {}
+  for _to in targets:
+    if _to in results:
+      continue
+    scheme_map = _get_scheme_map(*_resolve_dravidian_variant(_from, _to, maybe_use_dravidian_variant))
+    from_scheme = scheme_map.from_scheme
+    if scheme_map.translation_table is not None:
+      results[_to] = transliterate(data, scheme_map=scheme_map)
+      continue
+    # The source scheme may differ with the target, for Dravidian variants.
+    text = source_texts.get(id(from_scheme))
+    if text is None:
+      text = source_texts[id(from_scheme)] = from_scheme.unapply_shortcuts(data_in=data)
+    for preprocess in scheme_map.preprocessors:
+      text = preprocess(text)
+    key = (id(from_scheme), scheme_map._analysis_key, text)
+    analysis = analyses.get(key)
+    if from_scheme.is_roman:
+      if analysis is None:
+        analysis = analyses[key] = _analyze_roman(text, scheme_map)
+      result = _render_roman(analysis, scheme_map)
+    else:
+      if analysis is None:
+        analysis = analyses[key] = _analyze_brahmic(text, scheme_map)
+      result = _render_brahmic(analysis, scheme_map)
+    results[_to] = scheme_map.to_scheme.apply_shortcuts(data_in=result)
+  return results
 
 
 def get_standard_form(data, scheme_name):
+  if SCHEMES[scheme_name].is_roman:
+    return SCHEMES[scheme_name]._devanagari_rules.get_standard_form(data)
   return transliterate(data=transliterate(data=data, _from=scheme_name, _to=DEVANAGARI), _from=DEVANAGARI, _to=scheme_name)
 
 
@@ -1,6 +1,6 @@
-import regex
-
-from indic_transliteration.sanscript.schemes import brahmic
+# The token classes of the code points of a Brahmic source scheme, in the
+# tables of a SchemeMap.
+_OTHER_CLASS, _CONSONANT_CLASS, _VOWEL_MARK_CLASS, _VIRAMA_CLASS = range(4)
 
 
 def _brahmic(data, scheme_map, **kw):
@@ -11,87 +11,244 @@ def _brahmic(data, scheme_map, **kw):
   :param scheme_map: a dict that maps between characters in the old scheme
                      and characters in the new scheme
   """
-  if scheme_map.from_scheme.name == brahmic.GURMUKHI:
-    data = brahmic.GurmukhiScheme.replace_addak(text=data)
-  elif scheme_map.from_scheme.name == brahmic.BENGALI:
-    data = brahmic.BengaliScheme.replace_khanda(text=data)
-  elif scheme_map.from_scheme.name == brahmic.TELUGU:
-    data = brahmic.TeluguScheme.replace_n(text=data)
-  elif scheme_map.from_scheme.name == brahmic.KANNADA:
-    data = brahmic.KannadaScheme.replace_n(text=data)
-  elif scheme_map.from_scheme.name == brahmic.TAMIL_SUB:
-    data = brahmic.TamilScheme.move_before_maatraa_subscripts(text=data)
-  elif scheme_map.from_scheme.name == brahmic.TAMIL_SUP:
-    data = brahmic.TamilScheme.move_before_maatraa_superscripts(text=data)
-  vowel_marks = scheme_map.vowel_marks
+  for preprocess in scheme_map.preprocessors:
+    data = preprocess(data)
+  if scheme_map.translation_table is not None:
+    return _translate(data, scheme_map)
   virama = scheme_map.virama
   consonants = scheme_map.consonants
   non_marks_viraama = scheme_map.non_marks_viraama
   to_roman = scheme_map.to_scheme.is_roman
-  max_key_length_from_scheme = scheme_map.max_key_length_from_scheme
-
-  if to_roman and len(scheme_map.accents) > 0:
-    pattern = "([%s])([%s])" % ("".join(scheme_map.from_scheme['yogavaahas']), "".join(scheme_map.accents.keys()))
-    data = regex.sub(pattern, "\\2\\1", data)
+  code_point_offset = scheme_map.code_point_offset
+  code_point_outputs = scheme_map.code_point_outputs
+  code_point_classes = scheme_map.code_point_classes
+  code_point_token_lengths = scheme_map.code_point_token_lengths
+  other_code_points = scheme_map.other_code_points
+  table_size = len(code_point_outputs)
+  token_start_characters = scheme_map._token_start_characters
+  match_non_token_run = scheme_map._non_token_run_pattern.match
 
   buf = []
   i = 0
-  to_roman_had_consonant = found = False
+  len_data = len(data)
+  to_roman_had_consonant = False
   append = buf.append
-  # logging.debug(pprint.pformat(scheme_map.consonants))
 
   # We dont just translate each brAhmic character one after another in order to prefer concise transliterations when possible - for example ज्ञ -> jn in optitrans rather than j~n.
-  while i <= len(data):
-    # The longest token in the source scheme has length `max_key_length_from_scheme`. Iterate
-    # over `data` while taking `max_key_length_from_scheme` characters at a time. If we don`t
-    # find the character group in our scheme map, lop off a character and
-    # try again.
-    #
-    # If we've finished reading through `data`, then `token` will be empty
-    # and the loop below will be skipped.
-    token = data[i:i + max_key_length_from_scheme]
-
-    while token:
-      if len(token) == 1:
-        if token in vowel_marks:
-          append(vowel_marks[token])
-          found = True
-        elif token in virama:
-          append(virama[token])
-          found = True
-        else:
-          if to_roman_had_consonant:
-            append('a')
-          append(non_marks_viraama.get(token, token))
-          found = True
+  while i < len_data:
+    character = data[i]
+    index = ord(character) - code_point_offset
+    if 0 <= index < table_size:
+      output = code_point_outputs[index]
+      token_class = code_point_classes[index]
+      token_length = code_point_token_lengths[index]
+    else:
+      entry = other_code_points.get(character)
+      if entry is None:
+        # Runs of characters which start no source token are copied as they
+        # are, after ending any lingering consonant. Single such characters
+        # (like the spaces between words) are not worth a match.
+        if i + 1 < len_data and data[i + 1] not in token_start_characters:
+          match = match_non_token_run(data, i)
+          if match is not None:
+            if to_roman_had_consonant:
+              append('a')
+              to_roman_had_consonant = False
+            append(match.group())
+            i = match.end()
+            continue
+        output, token_class, token_length = character, _OTHER_CLASS, 0
       else:
-        if token in non_marks_viraama:
-          if to_roman_had_consonant:
-            append('a')
-          append(non_marks_viraama.get(token))
-          found = True
+        output, token_class, token_length = entry
 
-      if found:
+    # Only where the tables say that a multi-character token may start here
+    # are longer tokens looked for, the longest first.
+    if token_length:
+      token = None
+      for length in range(min(token_length, len_data - i), 1, -1):
+        if data[i:i + length] in non_marks_viraama:
+          token = data[i:i + length]
+          break
+      if token is not None:
+        if to_roman_had_consonant:
+          append('a')
+        append(non_marks_viraama[token])
         to_roman_had_consonant = to_roman and token in consonants
         i += len(token)
-        break        
-      else:
-        token = token[:-1]
+        continue
 
-    # Continuing the outer while loop.
-    # We've exhausted the token; this must be some other character. Due to
-    # the implicit 'a', we must explicitly end any lingering consonants
-    # before we can handle the current token.
-    if not found:
+    if token_class == _VOWEL_MARK_CLASS or token_class == _VIRAMA_CLASS:
+      append(output)
+      to_roman_had_consonant = False
+    else:
+      # Due to the implicit 'a', a lingering consonant is ended before any
+      # other token or character.
       if to_roman_had_consonant:
-        append(next(iter(virama.values())))
-      if i < len(data):
-        append(data[i])
-        to_roman_had_consonant = False
-      i += 1
-
-    found = False
+        append('a')
+      append(output)
+      to_roman_had_consonant = token_class == _CONSONANT_CLASS
+    i += 1
 
   if to_roman_had_consonant:
+    append(next(iter(virama.values())))
     append('a')
-  return ''.join(buf)
\ No newline at end of file
+  return ''.join(buf)
+
+
+def _translate(data, scheme_map):
+  """Transliterate `data` with :meth:`str.translate`. This function is used
+  when both the source and the destination schemes are Brahmic schemes.
+
+  :param data: the data to transliterate
+  :param scheme_map: a :class:`SchemeMap` with a `translation_table`
+  """
+  translation_table = scheme_map.translation_table
+  if scheme_map.irregular_token_pattern is None:
+    return data.translate(translation_table)
+  # Captured irregular tokens alternate with the text between them.
+  pieces = scheme_map.irregular_token_pattern.split(data)
+  non_marks_viraama = scheme_map.non_marks_viraama
+  pieces[0::2] = [x.translate(translation_table) for x in pieces[0::2]]
+  pieces[1::2] = [non_marks_viraama[x] for x in pieces[1::2]]
+  return ''.join(pieces)
+
+
+def _translate_batch(texts, scheme_map):
+  """Transliterate each of `texts` with NumPy. This function is used for
+  batches of texts when the :class:`SchemeMap` is layout-compatible.
+
+  The texts are encoded to UTF-32 together, and the code points of each
+  block with source letters are remapped through the lookup array of the
+  block. The few texts which may have irregular tokens, or which have
+  letters mapping to other than a single character, are done with
+  :func:`_translate` instead.
+
+  :param texts: an iterable of strings
+  :param scheme_map: a :class:`SchemeMap` whose `is_layout_compatible` is true
+  :return: the list of transliterated texts
+  """
+  import numpy
+  texts = list(texts)
+  for preprocess in scheme_map.preprocessors:
+    texts = [preprocess(x) for x in texts]
+  code_points = numpy.frombuffer(''.join(texts).encode('utf-32-le'), dtype='<u4')
+  mapped = code_points.copy()
+  blocks = code_points >> 7
+  offsets = code_points & 127
+  token_flags = numpy.zeros(len(code_points), dtype=numpy.uint8) if scheme_map.irregular_tokens else None
+  irregular_positions = []
+  for block, lookup in scheme_map._block_lookups.items():
+    positions = numpy.flatnonzero(blocks == block)
+    if len(positions) == 0:
+      continue
+    block_offsets = offsets[positions]
+    targets = numpy.array(lookup, dtype=numpy.int64)[block_offsets]
+    irregular = targets < 0
+    irregular_positions.append(positions[irregular])
+    mapped[positions[~irregular]] = targets[~irregular]
+    if token_flags is not None:
+      token_flags[positions] = numpy.array(scheme_map._block_token_flags[block], dtype=numpy.uint8)[block_offsets]
+
+  if token_flags is not None:
+    # An irregular token may start wherever a code point which starts one is
+    # followed, a token length later, by one which ends one. A match across
+    # two texts only sends both of them to _translate.
+    starts = (token_flags & 1).astype(bool)
+    ends = (token_flags & 2).astype(bool)
+    for length in set(len(x) for x in scheme_map.irregular_tokens):
+      if length > len(token_flags):
+        continue
+      candidates = numpy.flatnonzero(starts[:len(starts) - length + 1] & ends[length - 1:])
+      irregular_positions.extend([candidates, candidates + length - 1])
+
+  # Python strings index code points, just as the UTF-32 array does.
+  text_ends = numpy.cumsum([len(x) for x in texts], dtype=numpy.int64)
+  irregular_texts = set()
+  if irregular_positions:
+    irregular_texts.update(numpy.searchsorted(text_ends, numpy.concatenate(irregular_positions), side='right').tolist())
+
+  output = mapped.tobytes().decode('utf-32-le')
+  results = []
+  start = 0
+  for index, end in enumerate(text_ends.tolist()):
+    if index in irregular_texts:
+      results.append(_translate(texts[index], scheme_map))
+    else:
+      results.append(output[start:end])
+    start = end
+  return results
+
+
+# The kinds of the steps of _brahmic, as found by _analyze_brahmic.
+_TOKEN, _VOWEL_MARK, _VIRAMA, _IMPLICIT_A, _END = range(5)
+
+
+def _analyze_brahmic(data, scheme_map):
+  """Tokenize `data` (already preprocessed) and classify the tokens as
+  :func:`_brahmic` does. The output of :func:`_brahmic` for any scheme map
+  with the same source tokens (and consonants, for Roman destination schemes)
+  can then be rendered from this analysis with :func:`_render_brahmic`.
+
+  :return: a pair of the list of distinct steps - (kind, token) pairs - and
+           the list of their indices in the order they are taken
+  """
+  vowel_marks = scheme_map.vowel_marks
+  virama = scheme_map.virama
+  consonants = scheme_map.consonants
+  to_roman = scheme_map.to_scheme.is_roman
+
+  steps = []
+  # The index of each step, by kind and then by token.
+  step_indices = dict((kind, {}) for kind in (_TOKEN, _VOWEL_MARK, _VIRAMA, _IMPLICIT_A, _END))
+  sequence = []
+  append = sequence.append
+
+  def get_index(kind, token):
+    indices = step_indices[kind]
+    index = indices.get(token)
+    if index is None:
+      index = indices[token] = len(steps)
+      steps.append((kind, token))
+    return index
+
+  to_roman_had_consonant = False
+  for token in scheme_map._brahmic_token_pattern.findall(data):
+    if len(token) == 1 and token in vowel_marks:
+      append(get_index(_VOWEL_MARK, token))
+    elif len(token) == 1 and token in virama:
+      append(get_index(_VIRAMA, token))
+    else:
+      if to_roman_had_consonant:
+        append(get_index(_IMPLICIT_A, 'a'))
+      append(get_index(_TOKEN, token))
+    to_roman_had_consonant = to_roman and token in consonants
+
+  if to_roman_had_consonant:
+    append(get_index(_END, ''))
+  return steps, sequence
+
+
+def _render_brahmic(analysis, scheme_map):
+  """:return: the output of :func:`_brahmic` with `scheme_map`, from the
+           `analysis` made by :func:`_analyze_brahmic` (with this or an
+           equivalent scheme map)"""
+  steps, sequence = analysis
+  vowel_marks = scheme_map.vowel_marks
+  virama = scheme_map.virama
+  non_marks_viraama = scheme_map.non_marks_viraama
+
+  rendered_steps = []
+  for kind, token in steps:
+    if kind == _TOKEN:
+      rendered_steps.append(non_marks_viraama.get(token, token))
+    elif kind == _VOWEL_MARK:
+      rendered_steps.append(vowel_marks[token])
+    elif kind == _VIRAMA:
+      rendered_steps.append(virama[token])
+    elif kind == _IMPLICIT_A:
+      rendered_steps.append(token)
+    else:
+      # A lingering consonant at the end is closed with the (first) virama
+      # and the implicit 'a'.
+      rendered_steps.append(next(iter(virama.values())) + 'a')
+  return ''.join(map(rendered_steps.__getitem__, sequence))
@@ -0,0 +1,209 @@
+"""
+A compact, script-neutral form of a text, from which it can be rendered in any
+scheme::
+
+    ids = PhonemeIds.from_text('kSetrajJaH', sanscript.HK)
+    ids.render(sanscript.KANNADA)  # 'ಕ್ಷೇತ್ರಜ್ಞಃ'
+    ids.render(sanscript.IAST)  # 'kṣetrajñaḥ'
+
+The text is kept as the array of the IDs of its Devanagari tokens - letters,
+marks and the like, as :func:`transliterate` reads them from Devanagari - with
+any other characters in a side table. So a corpus can be stored once, and each
+view of it rendered on demand without tokenizing the text again: rendering
+just looks the IDs up in a table made for the target scheme.
+"""
+
+import functools
+import itertools
+import operator
+import weakref
+from array import array
+
+import regex
+
+from indic_transliteration import sanscript
+
+# The vocabulary (and its index) of each Devanagari to Devanagari scheme map,
+# and the render table of each scheme map from Devanagari.
+_vocabularies = weakref.WeakKeyDictionary()
+_render_tables = weakref.WeakKeyDictionary()
+
+
+def _get_vocabulary(scheme_map):
+  """:return: the tokens of Devanagari text, in the order of their IDs, and
+           the dict from each token to its ID"""
+  entry = _vocabularies.get(scheme_map)
+  if entry is None:
+    tokens = set(x for x in scheme_map.non_marks_viraama if 1 < len(x) <= scheme_map.max_key_length_from_scheme)
+    # Schemes lacking a token render its characters one by one, and so those
+    # have IDs as well.
+    characters = set(itertools.chain(*tokens))
+    for group_map in (scheme_map.vowel_marks, scheme_map.virama, scheme_map.non_marks_viraama):
+      characters.update(x for x in group_map if len(x) == 1)
+    vocabulary = tuple(sorted(tokens | characters))
+    entry = _vocabularies[scheme_map] = (vocabulary, dict((token, i) for i, token in enumerate(vocabulary)))
+  return entry
+
+
+class _RenderTable(object):
+  """What rendering IDs of the tokens of a `vocabulary` with a `scheme_map`
+  from Devanagari takes - as :func:`_brahmic` maps those tokens."""
+
+  def __init__(self, vocabulary, scheme_map):
+    self.vocabulary = vocabulary
+    index = dict((token, i) for i, token in enumerate(vocabulary))
+    vowel_marks = scheme_map.vowel_marks
+    virama = scheme_map.virama
+    non_marks_viraama = scheme_map.non_marks_viraama
+    consonants = scheme_map.consonants
+    self.to_roman = scheme_map.to_scheme.is_roman
+
+    self.strings = []
+    # Whether an implicit 'a' precedes the token after a consonant.
+    self.takes_a = []
+    self.is_consonant = []
+    # The IDs of the tokens read from each token missing in the target scheme.
+    self.expansions = {}
+    for i, token in enumerate(vocabulary):
+      if len(token) == 1 and token in vowel_marks:
+        self.strings.append(vowel_marks[token])
+        self.takes_a.append(False)
+      elif len(token) == 1 and token in virama:
+        self.strings.append(virama[token])
+        self.takes_a.append(False)
+      else:
+        self.strings.append(non_marks_viraama.get(token, token))
+        self.takes_a.append(True)
+        if len(token) > 1 and token not in non_marks_viraama:
+          self.expansions[i] = [index[x] for x in scheme_map._brahmic_token_pattern.findall(token)]
+      self.is_consonant.append(self.to_roman and token in consonants)
+
+    # A missing token read in pieces could leave its last piece to be read
+    # along with what follows, as a longer token of the target scheme. Texts
+    # with such tokens are transliterated as they are.
+    target_tokens = [x for x in non_marks_viraama if 1 < len(x) <= scheme_map.max_key_length_from_scheme]
+    self.unsafe_ids = set(i for i in self.expansions if any(
+      other.startswith(vocabulary[i][j:]) and len(other) > len(vocabulary[i]) - j
+      for other in target_tokens for j in range(1, len(vocabulary[i]))))
+    self.virama = virama
+
+  def render(self, ids, pass_through):
+    """:return: the rendering of `ids`, with those past the vocabulary
+             standing for the characters of `pass_through`"""
+    if self.expansions and not self.expansions.keys().isdisjoint(ids):
+      expansions = self.expansions
+      ids = list(itertools.chain.from_iterable(expansions.get(i, (i,)) for i in ids))
+    strings = self.strings + list(pass_through)
+    if not self.to_roman:
+      return "".join(map(strings.__getitem__, ids))
+
+    # The strings for tokens after a consonant follow the others, at
+    # an offset of `size`.
+    size = len(strings)
+    strings += ["a" + x if takes_a else x for x, takes_a in zip(self.strings, self.takes_a)]
+    strings += ["a" + x for x in pass_through]
+    offsets = [size if x else 0 for x in self.is_consonant] + [0] * len(pass_through)
+    offsets = list(map(offsets.__getitem__, ids))
+    result = "".join(map(strings.__getitem__, map(operator.add, ids, itertools.chain((0,), offsets))))
+    if offsets and offsets[-1]:
+      # A lingering consonant at the end is closed with the (first) virama
+      # and the implicit 'a'.
+      result += next(iter(self.virama.values())) + "a"
+    return result
+
+
+def _get_render_table(vocabulary, scheme_map):
+  table = _render_tables.get(scheme_map)
+  if table is None or table.vocabulary is not vocabulary:
+    table = _render_tables[scheme_map] = _RenderTable(vocabulary, scheme_map)
+  return table
+
+
+class PhonemeIds(object):
+  """A text, as the IDs of its Devanagari tokens.
+
+  :param ids: the :class:`array.array` of IDs, of type ``'H'`` unless the
+              text has too many distinct characters for that. They can be
+              viewed as a NumPy array with :func:`numpy.frombuffer`.
+  :param pass_through: the characters which aren't Devanagari tokens, with
+                       the IDs following those of the `vocabulary`
+  :param vocabulary: the tokens of Devanagari text, in the order of their IDs.
+                     It is shared by all the texts parsed with the same
+                     scheme data, and so stored just once in a pickle of
+                     many texts.
+  """
+
+  def __init__(self, ids, pass_through, vocabulary):
+    self.ids = ids
+    self.pass_through = pass_through
+    self.vocabulary = vocabulary
+
+  @classmethod
+  def from_text(cls, data, _from=sanscript.DEVANAGARI, **kw):
+    """Parse `data`, transliterating it to Devanagari first if need be.
+
+    :param _from: the scheme of `data`
+    :param kw: options, as for :func:`sanscript.transliterate`
+    """
+    if _from != sanscript.DEVANAGARI or kw:
+      data = sanscript.transliterate(data, _from, sanscript.DEVANAGARI, **kw)
+    scheme_map = sanscript._get_scheme_map(sanscript.DEVANAGARI, sanscript.DEVANAGARI)
+    vocabulary, index = _get_vocabulary(scheme_map)
+    data = scheme_map.from_scheme.unapply_shortcuts(data_in=data)
+    tokens = scheme_map._brahmic_token_pattern.findall(data)
+    pass_through = [x for x in dict.fromkeys(tokens) if x not in index]
+    if pass_through:
+      index = dict(index)
+      index.update((x, len(vocabulary) + i) for i, x in enumerate(pass_through))
+    typecode = "H" if len(vocabulary) + len(pass_through) <= 0x10000 else "I"
+    return cls(array(typecode, map(index.__getitem__, tokens)), "".join(pass_through), vocabulary)
+
+  def render(self, _to):
+    """:return: the text in the scheme `_to` - the same as transliterating
+             :meth:`to_text` from Devanagari"""
+    scheme_map = sanscript._get_scheme_map(sanscript.DEVANAGARI, _to)
+    table = _get_render_table(self.vocabulary, scheme_map)
+    # The preprocessors (for Roman schemes with accents) move accents before
+    # the yogavaahas they follow, which changes the tokens.
+    if (scheme_map.preprocessors and self._has_accented_yogavaahas) or not table.unsafe_ids.isdisjoint(self.ids):
+      return sanscript.transliterate(self.to_text(), scheme_map=scheme_map)
+    result = table.render(self.ids, self.pass_through)
+    return scheme_map.to_scheme.apply_shortcuts(data_in=result)
+
+  @functools.cached_property
+  def _has_accented_yogavaahas(self):
+    # The accents of any scheme map from Devanagari, alternates included.
+    scheme_map = sanscript._get_scheme_map(sanscript.DEVANAGARI, sanscript.DEVANAGARI)
+    pattern = "[%s][%s]" % ("".join(scheme_map.from_scheme["yogavaahas"]), "".join(scheme_map.accents))
+    return regex.search(pattern, self.to_text()) is not None
+
+  def to_text(self):
+    """:return: the (Devanagari) text"""
+    strings = self.vocabulary + tuple(self.pass_through)
+    return "".join(map(strings.__getitem__, self.ids))
+
+  def __len__(self):
+    return len(self.ids)
+
+  def __eq__(self, other):
+    if not isinstance(other, PhonemeIds):
+      return NotImplemented
+    return self.to_text() == other.to_text()
+
+  def __hash__(self):
+    return hash(self.to_text())
+
+  def __repr__(self):
+    return "%s.from_text(%r)" % (type(self).__name__, self.to_text())
+
+  def __getstate__(self):
+    return {"ids": self.ids, "pass_through": self.pass_through, "vocabulary": self.vocabulary}
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    vocabulary, _ = _get_vocabulary(sanscript._get_scheme_map(sanscript.DEVANAGARI, sanscript.DEVANAGARI))
+    if self.vocabulary != vocabulary:
+      # Parsed with other scheme data.
+      self.__dict__.update(PhonemeIds.from_text(self.to_text()).__dict__)
+    else:
+      self.vocabulary = vocabulary
@@ -1,5 +1,6 @@
-import regex
-from indic_transliteration.sanscript.schemes import roman
+import itertools
+
+from indic_transliteration.sanscript.brahmic_mapper import _CONSONANT_CLASS
 
 
 def _roman(data, scheme_map, **kw):
@@ -16,6 +17,7 @@ def _roman(data, scheme_map, **kw):
   virama = scheme_map.virama
   consonants = scheme_map.consonants
   non_marks_viraama = scheme_map.non_marks_viraama
+  token_trie = scheme_map.token_trie
   max_key_length_from_scheme = scheme_map.max_key_length_from_scheme
   to_roman = scheme_map.to_scheme.is_roman
 
@@ -25,10 +27,22 @@ def _roman(data, scheme_map, **kw):
   kw.pop('maybe_use_dravidian_variant', None)
   if kw:
     raise TypeError('Unexpected keyword argument %s' % list(kw.keys())[0])
+  if not (togglers or suspend_on or suspend_off):
+    if scheme_map.translation_table is not None:
+      return _roman_direct(data, scheme_map)
+    if scheme_map.code_point_outputs is not None:
+      return _roman_characters(data, scheme_map)
+  # Toggle and suspend tokens longer than the longest source token are never seen.
+  control_lengths = set(len(x) for x in itertools.chain(togglers, suspend_on, suspend_off)
+                        if len(x) <= max_key_length_from_scheme)
+  # Control tokens may start with any character, and so runs of characters
+  # which start no source token are only copied in bulk without them.
+  match_non_token_run = None if control_lengths else scheme_map._non_token_run_pattern.match
+  token_start_characters = scheme_map._token_start_characters
 
   buf = []
   i = 0
-  had_consonant = found = False
+  had_consonant = False
   len_data = len(data)
   append = buf.append
 
@@ -38,80 +52,307 @@ def _roman(data, scheme_map, **kw):
   # `suspended` overrides `toggled`.
   suspended = False
 
-  while i <= len_data:
-    # The longest token in the source scheme has length `max_key_length_from_scheme`. Iterate
-    # over `data` while taking `max_key_length_from_scheme` characters at a time. If we don`t
-    # find the character group in our scheme map, lop off a character and
-    # try again.
-    #
-    # If we've finished reading through `data`, then `token` will be empty
-    # and the loop below will be skipped.
-    token = data[i:i + max_key_length_from_scheme]
-
-    while token:
-      if token in togglers:
-        toggled = not toggled
-        i += 2  # skip over the token
-        found = True  # force the token to fill up again
+  while i < len_data:
+    # Walk the prefix trie of source tokens as far as `data` allows. `token`
+    # ends up as the longest source token starting at `i`, if any.
+    token = None
+    token_lengths = []
+    node = token_trie
+    j = i
+    while j < len_data:
+      node = node.get(data[j])
+      if node is None:
         break
+      j += 1
+      if None in node:
+        token = node[None]
+        token_lengths.append(j - i)
+
+    if control_lengths:
+      # Toggle and suspend tokens compete with source tokens: candidates are
+      # tried longest first, and while toggled or suspended, only the toggle
+      # and suspend tokens count.
+      candidate_lengths = control_lengths.union(token_lengths)
+      token = None
+      toggler_found = False
+      for length in sorted(candidate_lengths, reverse=True):
+        if i + length > len_data:
+          continue
+        candidate = data[i:i + length]
+        if candidate in togglers:
+          toggled = not toggled
+          toggler_found = True
+          break
 
-      if token in suspend_on:
-        suspended = True
-      elif token in suspend_off:
-        suspended = False
+        if candidate in suspend_on:
+          suspended = True
+        elif candidate in suspend_off:
+          suspended = False
 
-      if toggled or suspended:
-        token = token[:-1]
+        if toggled or suspended:
+          continue
+        if candidate in non_marks_viraama:
+          token = candidate
+          break
+      if toggler_found:
+        i += 2  # skip over the token
         continue
 
-      # Catch the pattern CV, where C is a consonant and V is a vowel.
-      # V should be rendered as a vowel mark, a.k.a. a "dependent"
-      # vowel. But due to the nature of Brahmic scripts, 'a' is implicit
-      # and has no vowel mark. If we see 'a', add nothing.
-      if had_consonant and token in vowels:
-        mark = vowel_marks.get(token, '')
+    # We've found no token; this must be some other character. Due to
+    # the implicit 'a', we must explicitly end any lingering consonants
+    # before we can handle the current character.
+    if token is None:
+      if had_consonant:
+        append(virama[''])
+      had_consonant = False
+      # Single such characters (like the spaces between words) are not worth
+      # a match.
+      match = None
+      if match_non_token_run and i + 1 < len_data and data[i + 1] not in token_start_characters:
+        match = match_non_token_run(data, i)
+      if match is not None:
+        append(match.group())
+        i = match.end()
+      else:
+        append(data[i])
+        i += 1
+      continue
+
+    # Catch the pattern CV, where C is a consonant and V is a vowel.
+    # V should be rendered as a vowel mark, a.k.a. a "dependent"
+    # vowel. But due to the nature of Brahmic scripts, 'a' is implicit
+    # and has no vowel mark. If we see 'a', add nothing.
+    if had_consonant and token in vowels:
+      mark = vowel_marks.get(token, '')
+      if mark:
+        append(mark)
+      elif to_roman:
+        append(vowels[token])
+
+    # Catch any non_marks_viraama character, including consonants, punctuation,
+    # and regular vowels. Due to the implicit 'a', we must explicitly
+    # end any lingering consonants before we can handle the current
+    # token.
+    else:
+      if had_consonant:
+        append(virama[''])
+      append(non_marks_viraama[token])
+
+    had_consonant = token in consonants
+    i += len(token)
+
+  # A toggle token at the very end may skip past the end of `data`; the
+  # lingering consonant is then left as is.
+  if had_consonant and i == len_data:
+    append(virama[''])
+
+  result = ''.join(buf)
+  for postprocess in scheme_map.postprocessors:
+    result = postprocess(result)
+  return result
+
+def _roman_direct(data, scheme_map):
+  """Transliterate `data` with the direct token map of `scheme_map`. This
+  function is used instead of :func:`_roman` between Roman schemes, without
+  togglers or suspend tokens.
+
+  Irregular tokens are split out with a pattern, and the text between them
+  is mapped with :meth:`str.translate`. Only the irregular tokens look at
+  whether a consonant precedes them, which is known from the piece before.
+
+  :param data: the data to transliterate
+  :param scheme_map: a :class:`SchemeMap` with `irregular_token_outputs`
+  """
+  translation_table = scheme_map.translation_table
+  if scheme_map.irregular_token_pattern is None:
+    result = data.translate(translation_table)
+  else:
+    irregular_token_outputs = scheme_map.irregular_token_outputs
+    consonants = scheme_map.consonants
+    # Captured irregular tokens alternate with the text between them.
+    pieces = scheme_map.irregular_token_pattern.split(data)
+    had_consonant = False
+    for index, piece in enumerate(pieces):
+      if index % 2:
+        output, output_after_consonant, had_consonant_next = irregular_token_outputs[piece]
+        pieces[index] = output_after_consonant if had_consonant else output
+        had_consonant = had_consonant_next
+      elif piece:
+        # Regular tokens leave the state their last characters do.
+        had_consonant = piece[-1] in consonants
+        pieces[index] = piece.translate(translation_table)
+    result = ''.join(pieces)
+
+  for postprocess in scheme_map.postprocessors:
+    result = postprocess(result)
+  return result
+
+
+def _roman_characters(data, scheme_map):
+  """Transliterate `data` with the given `scheme_map` a character at a time.
+  This function is used instead of :func:`_roman` when the source scheme
+  writes each letter with a single character, like SLP1 and WX.
+
+  Irregular multi-character tokens are split out with a pattern. Each other
+  character is looked up by its code point in the tables for the current
+  state - whether a consonant precedes.
+
+  :param data: the data to transliterate
+  :param scheme_map: a :class:`SchemeMap` with `code_point_outputs`
+  """
+  non_marks_viraama = scheme_map.non_marks_viraama
+  if scheme_map.irregular_token_pattern is not None:
+    # Captured irregular tokens alternate with the text between them.
+    pieces = scheme_map.irregular_token_pattern.split(data)
+  else:
+    pieces = [data]
+
+  vowels = scheme_map.vowels
+  vowel_marks = scheme_map.vowel_marks
+  consonants = scheme_map.consonants
+  virama = scheme_map.virama['']
+  to_roman = scheme_map.to_scheme.is_roman
+  code_point_offset = scheme_map.code_point_offset
+  # Indexed by whether a consonant precedes.
+  code_point_outputs = (scheme_map.code_point_outputs, scheme_map.code_point_outputs_after_consonant)
+  code_point_classes = scheme_map.code_point_classes
+  other_code_points = scheme_map.other_code_points
+  table_size = len(code_point_classes)
+
+  buf = []
+  append = buf.append
+  had_consonant = False
+  for piece_index, piece in enumerate(pieces):
+    if piece_index % 2:
+      # An irregular token, handled as in _roman.
+      if had_consonant and piece in vowels:
+        mark = vowel_marks.get(piece, '')
         if mark:
           append(mark)
         elif to_roman:
-          append(vowels[token])
-        found = True
-
-      # Catch any non_marks_viraama character, including consonants, punctuation,
-      # and regular vowels. Due to the implicit 'a', we must explicitly
-      # end any lingering consonants before we can handle the current
-      # token.
-      elif token in non_marks_viraama:
+          append(vowels[piece])
+      else:
         if had_consonant:
-          append(virama[''])
-        append(non_marks_viraama[token])
-        found = True
+          append(virama)
+        append(non_marks_viraama[piece])
+      had_consonant = piece in consonants
+      continue
+    for character in piece:
+      index = ord(character) - code_point_offset
+      if 0 <= index < table_size:
+        append(code_point_outputs[had_consonant][index])
+        had_consonant = code_point_classes[index] == _CONSONANT_CLASS
+      else:
+        entry = other_code_points.get(character)
+        if entry is None:
+          append(virama + character if had_consonant else character)
+          had_consonant = False
+        else:
+          append(entry[had_consonant])
+          had_consonant = entry[2] == _CONSONANT_CLASS
+  if had_consonant:
+    append(virama)
+  result = ''.join(buf)
+
+  for postprocess in scheme_map.postprocessors:
+    result = postprocess(result)
+  return result
+
+
+# The kinds of the steps of _roman, as found by _analyze_roman.
+_CHARACTER, _VIRAMA, _VOWEL_MARK, _TOKEN = range(4)
 
-      if found:
-        had_consonant = token in consonants
-        i += len(token)
+
+def _analyze_roman(data, scheme_map):
+  """Tokenize `data` and classify the tokens as :func:`_roman` does (without
+  toggle or suspend tokens). The output of :func:`_roman` for any scheme map
+  with the same source tokens, vowels and consonants can then be rendered
+  from this analysis with :func:`_render_roman`.
+
+  :return: a pair of the list of distinct steps - (kind, token) pairs - and
+           the list of their indices in the order they are taken
+  """
+  vowels = scheme_map.vowels
+  consonants = scheme_map.consonants
+  token_trie = scheme_map.token_trie
+
+  steps = []
+  step_indices = {}
+  sequence = []
+  append = sequence.append
+
+  def get_index(step):
+    index = step_indices.get(step)
+    if index is None:
+      index = step_indices[step] = len(steps)
+      steps.append(step)
+    return index
+
+  virama_step = (_VIRAMA, '')
+  i = 0
+  had_consonant = False
+  len_data = len(data)
+  while i < len_data:
+    token = None
+    node = token_trie
+    j = i
+    while j < len_data:
+      node = node.get(data[j])
+      if node is None:
         break
-      else:
-        token = token[:-1]
+      j += 1
+      if None in node:
+        token = node[None]
 
-    # We've exhausted the token; this must be some other character. Due to
-    # the implicit 'a', we must explicitly end any lingering consonants
-    # before we can handle the current token.
-    if not found:
+    if token is None:
       if had_consonant:
-        append(virama[''])
-      if i < len_data:
-        append(data[i])
-        had_consonant = False
+        append(get_index(virama_step))
+      append(get_index((_CHARACTER, data[i])))
+      had_consonant = False
       i += 1
+      continue
 
-    found = False
+    if had_consonant and token in vowels:
+      append(get_index((_VOWEL_MARK, token)))
+    else:
+      if had_consonant:
+        append(get_index(virama_step))
+      append(get_index((_TOKEN, token)))
 
-  result = ''.join(buf)
-  if not to_roman and len(scheme_map.accents) > 0:
-    pattern = "([%s])([%s])" % ("".join(scheme_map.accents.values()), "".join(scheme_map.to_scheme['yogavaahas']))
-    result = regex.sub(pattern, "\\2\\1", result)
-  
-  if scheme_map.from_scheme.name in roman.CAPITALIZABLE_SCHEME_IDS:
-    result = scheme_map.to_scheme.fix_om(result)
-
-  return result
\ No newline at end of file
+    had_consonant = token in consonants
+    i += len(token)
+
+  if had_consonant:
+    append(get_index(virama_step))
+  return steps, sequence
+
+
+def _render_roman(analysis, scheme_map):
+  """:return: the output of :func:`_roman` with `scheme_map`, from the
+           `analysis` made by :func:`_analyze_roman` (with this or an
+           equivalent scheme map)"""
+  steps, sequence = analysis
+  vowels = scheme_map.vowels
+  vowel_marks = scheme_map.vowel_marks
+  virama = scheme_map.virama
+  non_marks_viraama = scheme_map.non_marks_viraama
+  to_roman = scheme_map.to_scheme.is_roman
+
+  rendered_steps = []
+  for kind, token in steps:
+    if kind == _CHARACTER:
+      rendered_steps.append(token)
+    elif kind == _VIRAMA:
+      rendered_steps.append(virama[token])
+    elif kind == _VOWEL_MARK:
+      mark = vowel_marks.get(token, '')
+      if not mark and to_roman:
+        mark = vowels[token]
+      rendered_steps.append(mark)
+    else:
+      rendered_steps.append(non_marks_viraama[token])
+
+  result = ''.join(map(rendered_steps.__getitem__, sequence))
+  for postprocess in scheme_map.postprocessors:
+    result = postprocess(result)
+  return result
@@ -1,10 +1,60 @@
+import functools
 import itertools
 import os
 import os.path
+import threading
+from collections.abc import MutableMapping
+
 import regex
-import toml
 
-dev_vowel_to_mark_map = toml.load(os.path.join(os.path.dirname(__file__), "data/_devanagari_vowel_to_marks.toml"))
+from indic_transliteration.multi_replacer import MultiReplacer
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
+#: All the data files, compiled into one quickly loaded file by
+#: ``python -m indic_transliteration.sanscript.schemes.migrator compile``.
+BUNDLE_PATH = os.path.join(os.path.dirname(__file__), "scheme_bundle.json")
+_bundle = None
+
+
+def _get_bundle():
+  global _bundle
+  if _bundle is None:
+    import json
+    try:
+      with open(BUNDLE_PATH, "rb") as f:
+        _bundle = json.loads(f.read().decode("utf-8"))["files"]
+    except (OSError, ValueError, KeyError):
+      _bundle = {}
+  return _bundle
+
+
+def load_toml(file_path):
+  """Load a TOML file from the data directory - from the compiled bundle if
+  it has an up-to-date copy, and by parsing the file otherwise.
+  """
+  import hashlib
+  with open(file_path, "rb") as f:
+    content = f.read()
+  key = os.path.relpath(file_path, DATA_PATH).replace(os.sep, "/")
+  # Popped, since schemes modify the data they are made from.
+  entry = _get_bundle().pop(key, None)
+  if entry is not None and entry["sha256"] == hashlib.sha256(content).hexdigest():
+    return entry["data"]
+  import toml
+  return toml.loads(content.decode("utf-8"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_dev_vowel_to_mark_map():
+  """:return: the map from Devanagari vowels to the corresponding marks"""
+  return load_toml(os.path.join(DATA_PATH, "_devanagari_vowel_to_marks.toml"))
+
+
+def __getattr__(name):
+  # dev_vowel_to_mark_map is loaded on first use, to keep imports fast.
+  if name == "dev_vowel_to_mark_map":
+    return get_dev_vowel_to_mark_map()
+  raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 
 from enum import IntEnum
@@ -34,45 +84,116 @@ class Scheme(dict):
     self.name = name
     self.long_vowels = [self["vowels"][x] for x in "आईऊॠएऐओऔ"]
 
+  @functools.cached_property
+  def is_single_character(self):
+    """Whether this is a romanization which writes each letter (vowel,
+    consonant, vowel mark or yogavaaha - conjuncts aside) with a single
+    character, combining marks aside, like SLP1 and WX."""
+    import unicodedata
+    if not self.is_roman:
+      return False
+    for group in ("vowels", "consonants", "vowel_marks", "yogavaahas"):
+      for key, value in self.get(group, {}).items():
+        if "्" not in key and len([x for x in value if not unicodedata.combining(x)]) > 1:
+          return False
+    return True
+
+  @functools.cached_property
+  def _om_pattern(self):
+    return regex.compile(r"(?<=(^|\s|\p{Punct}))%s(%s|%s)(?=(\s|$|\p{Punct}))" % (self["vowels"]["ओ"], self["yogavaahas"]["ं"], self["consonants"]["म"] + self["virama"]["्"]))
+
   def fix_om(self, data_in):
-    replacement_pattern = r"(?<=(^|\s|\p{Punct}))%s(%s|%s)(?=(\s|$|\p{Punct}))" % (self["vowels"]["ओ"], self["yogavaahas"]["ं"], self["consonants"]["म"] + self["virama"]["्"])
-    return regex.sub(replacement_pattern, self["symbols"]["ॐ"], data_in)
+    return self._om_pattern.sub(self["symbols"]["ॐ"], data_in)
+
+  @functools.cached_property
+  def _shortcut_replacer(self):
+    passes = []
+    for key, shortcut in self["shortcuts"].items():
+      if key in shortcut:
+        # An actually long "Shortcut" may already exist in the data
+        passes.append((shortcut, key))
+      passes.append((key, shortcut))
+    return MultiReplacer.from_passes(passes)
+
+  @functools.cached_property
+  def _shortcut_unreplacer(self):
+    passes = []
+    for key, shortcut in self["shortcuts"].items():
+      if shortcut in key:
+        # An actually long "key" may already exist in the data
+        passes.append((key, shortcut))
+      passes.append((shortcut, key))
+    return MultiReplacer.from_passes(passes)
 
   def apply_shortcuts(self, data_in):
     if "shortcuts" in self:
-      for key, shortcut in self["shortcuts"].items():
-        if key in shortcut:
-          # An actually long "Shortcut" may already exist in the data
-          data_in = data_in.replace(shortcut, key)
-        data_in = data_in.replace(key, shortcut)
+      data_in = self._shortcut_replacer.replace(data_in)
     return data_in
 
   def unapply_shortcuts(self, data_in):
     if "shortcuts" in self:
-      for key, shortcut in self["shortcuts"].items():
-        if shortcut in key:
-          # An actually long "key" may already exist in the data
-          data_in = data_in.replace(key, shortcut)
-        data_in = data_in.replace(shortcut, key)
+      data_in = self._shortcut_unreplacer.replace(data_in)
     return data_in
 
   def fix_lazy_anusvaara_except_padaantas(self, data_in, omit_sam, omit_yrl):
+    # Words are fixed one at a time, and each distinct one only once. Only
+    # those which may change are looked at - all of them only where others
+    # could change too.
+    fixed_words = {}
+
+    def fix_word(match):
+      word = match.group()
+      fixed_word = fixed_words.get(word)
+      if fixed_word is None:
+        ## We don't want ग्रामं गच्छ to turn into ग्रामङ् गच्छ or ग्रामम् गच्छ 
+        if word[-1] == "ं": 
+          fixed_word = self.fix_lazy_anusvaara(word[:-1], omit_sam=omit_sam, omit_yrl=omit_yrl, ignore_padaanta=False) + word[-1]
+        else:
+          fixed_word = self.fix_lazy_anusvaara(word, omit_sam=omit_sam, omit_yrl=omit_yrl, ignore_padaanta=False)
+        fixed_words[word] = fixed_word
+      return fixed_word
+
+    # That is checked for the words of all lines at once, and for those of
+    # each line only if that fails.
+    fixes_only_lazy_anusvaara_words = self._fixes_only_lazy_anusvaara_words(" ".join(data_in.split()))
     lines = data_in.split("\n")
     lines_out = []
     for line in lines:
       initial_space = "".join(itertools.takewhile(str.isspace, line))
       final_space = "".join(itertools.takewhile(str.isspace, line[::-1]))
-      words = line.split()
-      ## We don't want ग्रामं गच्छ to turn into ग्रामङ् गच्छ or ग्रामम् गच्छ 
-      fixed_words = []
-      for word in words:
-        if word[-1] == "ं": 
-          fixed_words.append(self.fix_lazy_anusvaara(word[:-1], omit_sam=omit_sam, omit_yrl=omit_yrl, ignore_padaanta=False) + word[-1])
-        else:
-          fixed_words.append(self.fix_lazy_anusvaara(word, omit_sam=omit_sam, omit_yrl=omit_yrl, ignore_padaanta=False))
-      lines_out.append("%s%s%s" % (initial_space, " ".join(fixed_words), final_space))
+      words = " ".join(line.split())
+      if fixes_only_lazy_anusvaara_words or self._fixes_only_lazy_anusvaara_words(words):
+        word_pattern = self._lazy_anusvaara_word_pattern
+        if word_pattern is not None:
+          words = word_pattern.sub(fix_word, words)
+      else:
+        words = self._any_word_pattern.sub(fix_word, words)
+      lines_out.append("%s%s%s" % (initial_space, words, final_space))
     return "\n".join(lines_out)
 
+  #: Any word in a line of words separated by single spaces
+  _any_word_pattern = regex.compile("[^ ]+")
+
+  @functools.cached_property
+  def _lazy_anusvaara_word_pattern(self):
+    """:return: a pattern for the words (in a line of words separated by single
+             spaces) which :meth:`fix_lazy_anusvaara` may change, or None if
+             it changes none"""
+    strings = self._devanagari_rules.anusvaaras + list(itertools.chain(*self.get("shortcuts", {}).items()))
+    if not strings:
+      return None
+    return regex.compile(r"[^ ]*(?:%s)[^ ]*" % "|".join(regex.escape(x) for x in strings))
+
+  def _fixes_only_lazy_anusvaara_words(self, text):
+    """:return: whether :meth:`fix_lazy_anusvaara` leaves the words of `text`
+             which don't match :attr:`_lazy_anusvaara_word_pattern` as they are"""
+    return self._devanagari_rules.leaves_words_alone(text)
+
+  @functools.cached_property
+  def _devanagari_rules(self):
+    from indic_transliteration.sanscript.schemes.devanagari_rules import DevanagariRules
+    return DevanagariRules(self)
+
   def fix_lazy_anusvaara(self, data_in, omit_sam=False, omit_yrl=False, ignore_padaanta=True):
     """
     Assumption: space and newlines are the word delimiters.
@@ -83,13 +204,9 @@ class Scheme(dict):
     :param ignore_padaanta: 
     :return: 
     """
-    from indic_transliteration import sanscript
     if ignore_padaanta:
       return self.fix_lazy_anusvaara_except_padaantas(data_in=data_in, omit_sam=omit_sam, omit_yrl=omit_yrl)
-    data_out = sanscript.transliterate(data=data_in, _from=self.name, _to=sanscript.DEVANAGARI)
-    data_out = sanscript.SCHEMES[sanscript.DEVANAGARI].fix_lazy_anusvaara(data_in=data_out, omit_sam=omit_sam,
-                                                                          omit_yrl=omit_yrl)
-    return sanscript.transliterate(data=data_out, _from=sanscript.DEVANAGARI, _to=self.name)
+    return self._devanagari_rules.fix_lazy_anusvaara(data_in, omit_sam=omit_sam, omit_yrl=omit_yrl)
 
 
   def approximate_visargas(self, data, mode=VisargaApproximation.H):
@@ -99,31 +216,8 @@ class Scheme(dict):
     :param mode: 
     :return: 
     """
-    from indic_transliteration import sanscript
     if mode == VisargaApproximation.AHA:
-      # अ is deliberately placed in the end below.
-      replacements = [("आः", "आह"),
-                      ("इः", "इहि"),
-                      ("ईः", "ईहि"),
-                      ("उः", "उहु"),
-                      ("ऊः", "ऊहु"),
-                      ("ॠः", "ॠहि"),
-                      ("एः", "एहे"),
-                      ("ऐः", "एहि"),
-                      ("ओः", "ओहो"),
-                      ("औः", "औहु"),
-                      ("अः", "अह"),
-                      ]
-      data_out = sanscript.transliterate(data=data, _from=self.name, _to=sanscript.DEVANAGARI)
-      for old, new in replacements:
-        data_out = data_out.replace(old, new)
-        if not old.startswith("अ"):
-          old_mark = sanscript.SCHEMES[sanscript.DEVANAGARI].vowel_to_mark_map[old[0]]
-          data_out = data_out.replace(old.replace(old[0], old_mark), new.replace(old[0], old_mark))
-      # Only akAra+visarga should be left at this point.
-      data_out = data_out.replace("ः", "ह")
-      data_out = sanscript.transliterate(data=data_out, _from=sanscript.DEVANAGARI, _to=self.name)
-      return data_out
+      return self._devanagari_rules.approximate_visargas(data)
     elif mode == VisargaApproximation.H:
       return data.replace(self["yogavaahas"]["ः"], self["consonants"]["ह"] + self["virama"]["्"])
     elif mode is None:
@@ -132,19 +226,10 @@ class Scheme(dict):
       raise NotImplementedError()
 
   def replace_terminal_anusvaara(self, data_in):
-    from indic_transliteration import sanscript
-    data_out = sanscript.transliterate(data=data_in, _from=self.name, _to=sanscript.DEVANAGARI)
-    if data_out.endswith("ं"):
-      data_out = data_out[:-1] + "म्"
-      return sanscript.transliterate(data=data_out, _from=sanscript.DEVANAGARI, _to=self.name)
-    else:
-      return data_in
+    return self._devanagari_rules.replace_terminal_anusvaara(data_in)
 
   def force_lazy_anusvaara(self, data_in):
-    from indic_transliteration import sanscript
-    data_out = sanscript.transliterate(data=data_in, _from=self.name, _to=sanscript.DEVANAGARI)
-    data_out = sanscript.SCHEMES[sanscript.DEVANAGARI].force_lazy_anusvaara(data_in=data_out)
-    return sanscript.transliterate(data=data_out, _from=sanscript.DEVANAGARI, _to=self.name)
+    return self._devanagari_rules.force_lazy_anusvaara(data_in)
 
   def from_devanagari(self, data):
     """A convenience method"""
@@ -152,8 +237,67 @@ class Scheme(dict):
     return sanscript.transliterate(data=data, _from=sanscript.DEVANAGARI, _to=self.name)
 
 
+class LazySchemeMap(MutableMapping):
+  """A mapping from scheme names to :class:`Scheme` objects, which loads
+  each scheme only when it is first looked up. Listing the names (or
+  checking whether a name is present) loads nothing.
+
+  Schemes are added with :meth:`add_loader` (to be loaded later) or by plain
+  assignment (already loaded).
+  """
+
+  def __init__(self):
+    # name -> loader, or None if the scheme was assigned directly.
+    self._loaders = {}
+    self._schemes = {}
+    self._lock = threading.RLock()
+
+  def add_loader(self, name, loader):
+    """Add the scheme `name`, to be obtained by calling `loader` when first
+    needed."""
+    self._loaders[name] = loader
+    self._schemes.pop(name, None)
+
+  def update_lazily(self, other):
+    """Add all schemes of the :class:`LazySchemeMap` `other`, without
+    loading them. They are obtained from (and so shared with) `other` when
+    first needed."""
+    for name in other:
+      self.add_loader(name, functools.partial(other.__getitem__, name))
+
+  def __getitem__(self, name):
+    try:
+      return self._schemes[name]
+    except KeyError:
+      pass
+    loader = self._loaders[name]
+    with self._lock:
+      if name not in self._schemes:
+        self._schemes[name] = loader()
+      return self._schemes[name]
+
+  def __setitem__(self, name, scheme):
+    self._loaders[name] = None
+    self._schemes[name] = scheme
+
+  def __delitem__(self, name):
+    del self._loaders[name]
+    self._schemes.pop(name, None)
+
+  def __contains__(self, name):
+    return name in self._loaders
+
+  def __iter__(self):
+    return iter(list(self._loaders))
+
+  def __len__(self):
+    return len(self._loaders)
+
+  def __repr__(self):
+    return "%s(%r)" % (type(self).__name__, list(self._loaders))
+
+
 def load_scheme(file_path, cls, **kwargs):
-  import codecs
   is_roman = "roman" in file_path
   name = os.path.basename(file_path).replace(".toml", "")
 
@@ -162,7 +306,5 @@ def load_scheme(file_path, cls, **kwargs):
       return data
     return cls(data=data, name=name, is_roman=is_roman, **kwargs)
 
-  with codecs.open(file_path, "r", 'utf-8') as file_out:
-    scheme_map = toml.load(file_out)
-    scheme = scheme_maker(data=scheme_map)
-    return scheme
+  scheme_map = load_toml(file_path)
+  return scheme_maker(data=scheme_map)
@@ -1,13 +1,14 @@
 # Brahmi schemes
 # -------------
-import logging
+import functools
 import sys
 
 import regex
-import tqdm
 
+from indic_transliteration.multi_replacer import MultiReplacer
+from indic_transliteration.rewrite_rules import RewriteRules
 from indic_transliteration.sanscript import Scheme
-from indic_transliteration.sanscript.schemes import dev_vowel_to_mark_map
+from indic_transliteration.sanscript.schemes import get_dev_vowel_to_mark_map
 from functools import reduce
 
 
@@ -19,7 +20,7 @@ class BrahmicScheme(Scheme):
     if "vowel_marks" in self:
       self.vowel_to_mark_map = {}
       self.mark_to_vowel_map = {}
-      for (vowel, vowel_mark) in dev_vowel_to_mark_map.items():
+      for (vowel, vowel_mark) in get_dev_vowel_to_mark_map().items():
         if vowel in self["vowels"] and vowel_mark in self["vowel_marks"]:
           self.vowel_to_mark_map[self["vowels"][vowel]] = self["vowel_marks"][vowel_mark]
           self.mark_to_vowel_map[self["vowel_marks"][vowel_mark]] = self["vowels"][vowel]
@@ -126,6 +127,7 @@ class BrahmicScheme(Scheme):
         result = [[""]]
       return result[0]
     except ImportError:
+      import logging
       logging.warning("sandhi package is not installed.")
       result = str1 + str2
       return result
@@ -148,19 +150,31 @@ class BrahmicScheme(Scheme):
     dev_numerals = "० १ २ ३ ४ ५ ६ ७ ८ ९".split()
     return [self["symbols"][x] for x in dev_numerals]
 
+  @functools.cached_property
+  def _roman_numeral_replacer(self):
+    native_numerals = self.get_numerals()
+    if not all(len(native_numeral) == 1 for native_numeral in native_numerals):
+      # Numerals such as Kharoshthi's are not plain digits.
+      return None
+    return MultiReplacer.from_passes((native_numeral, str(numeral)) for numeral, native_numeral in enumerate(native_numerals))
+
   def apply_roman_numerals(self, in_string):
+    if self._roman_numeral_replacer is not None:
+      return self._roman_numeral_replacer.replace(in_string)
     out_string = in_string
     native_numerals = self.get_numerals()
     for numeral, native_numeral in enumerate(native_numerals):
       out_string = out_string.replace(str(native_numeral), str(numeral))
     return out_string
 
+  _svara_removals = RewriteRules([[
+    (f"[१३]{ACCENTS}+", ""),
+    (ACCENTS, ""),
+    ("ꣳ", "ं"),
+  ]])
+
   def remove_svaras(self, in_string):
-    SVARAS = r"[\u1CD0-\u1CE8\u1CF9\u1CFA\uA8E0-\uA8F1\u0951-\u0954\u0957]"
-    out_string = regex.sub(f"[१३]{SVARAS}+", "", in_string)
-    out_string = regex.sub(SVARAS, "", out_string)
-    out_string = out_string.replace("ꣳ", "ं")
-    return out_string
+    return self._svara_removals.apply(in_string)
 
   def remove_punctuation(self, in_string):
     return regex.sub(r"[.।॥:-]", "", in_string)
@@ -181,6 +195,28 @@ class BrahmicScheme(Scheme):
     return letters
 
 
+@functools.lru_cache(maxsize=None)
+def _get_lazy_anusvaara_fixes(omit_sam, omit_yrl):
+  """:return: the :class:`RewriteRules` for :meth:`DevanagariScheme.fix_lazy_anusvaara`"""
+  if omit_sam:
+    prefix = "(?<!स)"
+  else:
+    prefix = ""
+  # ं is moved past ऽ first. The rest share a stage: each starts at a ं of
+  # its own, and none leaves one at the end for ं$.
+  stages = [[("ंऽ", "ऽं")], [
+    ('%sं( *)([क-ङ])' % (prefix), r'ङ्\1\2'),
+    ('%sं( *)([च-ञ])' % (prefix), r'ञ्\1\2'),
+    ('%sं( *)([त-न])' % (prefix), r'न्\1\2'),
+    ('%sं( *)([ट-ण])' % (prefix), r'ण्\1\2'),
+    ('%sं( *)([प-म])' % (prefix), r'म्\1\2'),
+    ('ं$', r'म्'),
+  ]]
+  if not omit_yrl:
+    stages[-1].append(('%sं( *)([यलव])' % (prefix), r'\2्ँ\1\2'))
+  return RewriteRules(stages)
+
+
 class DevanagariScheme(BrahmicScheme):
   PATTERN_BASE_BLOCK = r"\u0900-ॿ"
   PATTERN_CONSONANT_MODIFIER = "़्"
@@ -207,49 +243,54 @@ class DevanagariScheme(BrahmicScheme):
   PATTERN_MANIPRAVALA_MID_K_L = f"(?<=[^\\s्])क(?=[{PATTERN_MATRA}]?ळ)"
 
 
+  _lazy_visarga_fixes = RewriteRules([[
+    (r'ः( *)([क-ङ])', r'ᳵ\1\2'),
+    (r'ः( *)([प-म])', r'ᳶ\1\2'),
+  ]])
+
   @classmethod
   def fix_lazy_visarga(cls, data_in):
-    data_out = data_in
-    import regex
-    data_out = regex.sub(r'ः( *)([क-ङ])', r'ᳵ\1\2', data_out)
-    data_out = regex.sub(r'ः( *)([प-म])', r'ᳶ\1\2', data_out)
-    return data_out
+    return cls._lazy_visarga_fixes.apply(data_in)
+
 
+  _lazy_anusvaara_word_pattern = regex.compile(r"[^ ]*ं[^ ]*")
+
+  def _fixes_only_lazy_anusvaara_words(self, text):
+    return True
 
   def fix_lazy_anusvaara(self, data_in, omit_sam=False, omit_yrl=False, ignore_padaanta=True):
     # Overriding because we don't want to turn जगइ to जगै
     if ignore_padaanta:
       return self.fix_lazy_anusvaara_except_padaantas(data_in=data_in, omit_sam=omit_sam, omit_yrl=omit_yrl)
-    data_out = data_in
-    import regex
-    if omit_sam:
-      prefix = "(?<!स)"
-    else:
-      prefix = ""
-    data_out = regex.sub("ंऽ", "ऽं", data_out)
-    data_out = regex.sub('%sं( *)([क-ङ])' % (prefix), r'ङ्\1\2', data_out)
-    data_out = regex.sub('%sं( *)([च-ञ])' % (prefix), r'ञ्\1\2', data_out)
-    data_out = regex.sub('%sं( *)([त-न])' % (prefix), r'न्\1\2', data_out)
-    data_out = regex.sub('%sं( *)([ट-ण])' % (prefix), r'ण्\1\2', data_out)
-    data_out = regex.sub('%sं( *)([प-म])' % (prefix), r'म्\1\2', data_out)
-    data_out = regex.sub('ं$', r'म्', data_out)
-    if not omit_yrl:
-      data_out = regex.sub('%sं( *)([यलव])' % (prefix), r'\2्ँ\1\2', data_out)
-    return data_out
+    return _get_lazy_anusvaara_fixes(omit_sam=omit_sam, omit_yrl=omit_yrl).apply(data_in)
+
+  # As in _get_lazy_anusvaara_fixes, these share a stage.
+  _lazy_anusvaara_forcings = RewriteRules([[
+    ('ङ्( *)([क-ङ])', r'ं\1\2'),
+    ('ञ्( *)([च-ञ])', r'ं\1\2'),
+    ('न्( *)([त-न])', r'ं\1\2'),
+    ('ण्( *)([ट-ण])', r'ं\1\2'),
+    ('म्( *)([प-म])', r'ं\1\2'),
+    ('ं$', r'म्'),
+    ('[यलव]्ँ( *)([यलव])', r'ं\1\2'),
+  ]])
 
   def force_lazy_anusvaara(self, data_in):
     # Overriding because we don't want to turn जगइ to जगै
-    data_out = data_in
-    import regex
-    prefix = ""
-    data_out = regex.sub('ङ्( *)([क-ङ])', r'ं\1\2', data_out)
-    data_out = regex.sub('ञ्( *)([च-ञ])', r'ं\1\2', data_out)
-    data_out = regex.sub('न्( *)([त-न])', r'ं\1\2', data_out)
-    data_out = regex.sub('ण्( *)([ट-ण])', r'ं\1\2', data_out)
-    data_out = regex.sub('म्( *)([प-म])', r'ं\1\2', data_out)
-    data_out = regex.sub('ं$', r'म्', data_out)
-    data_out = regex.sub('[यलव]्ँ( *)([यलव])', r'ं\1\2', data_out)
-    return data_out
+    return self._lazy_anusvaara_forcings.apply(data_in)
+
+  @functools.cached_property
+  def _numbered_vargiiya_vyanjana_fixes(self):
+    VIRAMA = self["virama"]["्"]
+    unvoiced = dict(zip("गजडदब", "कचटतप"))
+    stages = []
+    # One stage per superscript, since one consonant may bear several.
+    for index, superscript in enumerate("¹²³⁴⁵"):
+      def shifter(match, index=index):
+        consonant = unvoiced.get(match.group(1), match.group(1))
+        return chr(ord(consonant) + index) + match.group(2)
+      stages.append([(fr"([कचटतपगजडदब])([{VIRAMA}{self.PATTERN_DEPENDENT_VOWEL}]?){superscript}", shifter)])
+    return RewriteRules(stages)
 
   def fix_numbered_vargiiya_vyanjanas(self, data_in):
     """Useful for devanAgarified tamil.
@@ -257,21 +298,11 @@ class DevanagariScheme(BrahmicScheme):
     :param data_in: 
     :return: 
     """
-    data_out = data_in
-    superscripts = "¹²³⁴⁵"
-    VIRAMA = self["virama"]["्"]
-    for index, superscript in enumerate(superscripts):
-      data_out = regex.sub(rf"ग(?=[{VIRAMA}{self.PATTERN_DEPENDENT_VOWEL}]?{superscript})", "क", data_out)
-      data_out = regex.sub(rf"ज(?=[{VIRAMA}{self.PATTERN_DEPENDENT_VOWEL}]?{superscript})", "च", data_out)
-      data_out = regex.sub(rf"ड(?=[{VIRAMA}{self.PATTERN_DEPENDENT_VOWEL}]?{superscript})", "ट", data_out)
-      data_out = regex.sub(rf"द(?=[{VIRAMA}{self.PATTERN_DEPENDENT_VOWEL}]?{superscript})", "त", data_out)
-      data_out = regex.sub(rf"ब(?=[{VIRAMA}{self.PATTERN_DEPENDENT_VOWEL}]?{superscript})", "प", data_out)
-      def shifter(ch):
-        return chr(ord(ch) + index)
-      data_out = regex.sub(fr"([कचटतप])([{VIRAMA}{self.PATTERN_DEPENDENT_VOWEL}]?){superscript}", lambda x: shifter(x.group(1))+x.group(2), data_out)
-    return data_out
+    return self._numbered_vargiiya_vyanjana_fixes.apply(data_in)
 
   def redo_upapada_sandhis(self, text, level="svara"):
+    import logging
+    import tqdm
     padas = regex.split(rf"([^{self.PATTERN_BASE_BLOCK}\-]+)", text)
     padas_out = []
     for pada in tqdm.tqdm(padas):
@@ -325,54 +356,54 @@ class DevanagariScheme(BrahmicScheme):
 class BengaliScheme(BrahmicScheme):
   @classmethod
   def replace_khanda(cls, text):
-    text = regex.sub("ৎ", "ত্", text)
-    return text
+    return text.replace("ৎ", "ত্")
 
 
 class TeluguScheme(BrahmicScheme):
   @classmethod
   def replace_n(cls, text):
-    text = regex.sub("ౝ", "న్", text)
-    return text
+    return text.replace("ౝ", "న్")
 
 
 class KannadaScheme(BrahmicScheme):
+  N_REPLACEMENTS = str.maketrans({"ೝ": "ನ್", "೜": "श्री"})
+
   @classmethod
   def replace_n(cls, text):
-    text = regex.sub("ೝ", "ನ್", text)
-    text = regex.sub("೜", "श्री", text)
-    return text
+    return text.translate(cls.N_REPLACEMENTS)
 
 
 class GurmukhiScheme(BrahmicScheme):
+  # An addak doubles the consonant after it - aspirated stops by way of the
+  # unaspirated one (the first in each group). The nukta letters are escaped,
+  # since they must stay precomposed.
+  ADDAK_DOUBLINGS = [("ਕਖ", "ਕ"), ("ਗਘ", "ਗ"), ("ਚਛ", "ਚ"), ("ਜਝ", "ਜ"), ("ਟਠ", "ਟ"), ("ਡਢ", "ਡ"), ("ਤਥ", "ਤ"), ("ਦਧ", "ਦ"), ("ਪਫ", "ਪ"), ("ਬਭ", "ਬ"), ("ਯਰਲਵ\u0a36ਸਹਙਞਣਨਮ\u0a5bੜ\u0a5e", None)]
+  ADDAK_PASSES = [(regex.compile("ੱ([%s])" % consonants), (first or r"\g<1>") + r"੍\g<1>") for (consonants, first) in ADDAK_DOUBLINGS]
+  ADDAK_PATTERN = regex.compile("ੱ([%s])" % "".join(consonants for (consonants, _) in ADDAK_DOUBLINGS))
+  # Reversed, so that the earliest group of a consonant wins, as in ADDAK_PASSES.
+  ADDAK_REPLACEMENTS = {consonant: (first or consonant) + "੍" + consonant for (consonants, first) in reversed(ADDAK_DOUBLINGS) for consonant in consonants}
 
   @classmethod
   def replace_addak(cls, text):
-    text = regex.sub("ੱ([ਕਖ])", r"ਕ੍\g<1>", text, flags=regex.UNICODE)
-    text = regex.sub(r"ੱ([ਗਘ])", r"ਗ੍\g<1>", text)
-    text = regex.sub("ੱ([ਚਛ])", r"ਚ੍\g<1>", text)
-    text = regex.sub("ੱ([ਜਝ])", r"ਜ੍\g<1>", text)
-    text = regex.sub("ੱ([ਟਠ])", r"ਟ੍\g<1>", text)
-    text = regex.sub("ੱ([ਡਢ])", r"ਡ੍\g<1>", text)
-    text = regex.sub("ੱ([ਤਥ])", r"ਤ੍\g<1>", text)
-    text = regex.sub("ੱ([ਦਧ])", r"ਦ੍\g<1>", text)
-    text = regex.sub("ੱ([ਪਫ])", r"ਪ੍\g<1>", text)
-    text = regex.sub("ੱ([ਬਭ])", r"ਬ੍\g<1>", text)
-    text = regex.sub("ੱ([ਯਰਲਵਸ਼ਸਹਙਞਣਨਮਜ਼ੜਫ਼])", r"\g<1>੍\g<1>", text)
-    return text
+    if "ੱੱ" in text:
+      # Repeated addaks are resolved pass by pass (one per group), which a
+      # single pass would not reproduce.
+      for (pattern, replacement) in cls.ADDAK_PASSES:
+        text = pattern.sub(replacement, text)
+      return text
+    return cls.ADDAK_PATTERN.sub(lambda match: cls.ADDAK_REPLACEMENTS[match.group(1)], text)
 
 class TamilScheme(BrahmicScheme):
+  SUBSCRIPT_PATTERN = regex.compile("([ா-ௌ꞉ம்]+)([₂₃₄])")
+  SUPERSCRIPT_PATTERN = regex.compile("([ா-ௌ꞉ம்]+)([²³⁴])")
+
   @classmethod
   def move_before_maatraa_subscripts(cls, text):
-    import regex
-    text = regex.sub("([ா-ௌ꞉ம்]+)([₂₃₄])", r"\g<2>\g<1>", text, flags=regex.UNICODE)
-    return text
+    return cls.SUBSCRIPT_PATTERN.sub(r"\g<2>\g<1>", text)
 
   @classmethod
   def move_before_maatraa_superscripts(cls, text):
-    import regex
-    text = regex.sub("([ா-ௌ꞉ம்]+)([²³⁴])", r"\g<2>\g<1>", text, flags=regex.UNICODE)
-    return text
+    return cls.SUPERSCRIPT_PATTERN.sub(r"\g<2>\g<1>", text)
 
   @classmethod
   def transliterate_subscripted(cls, text, _to):
@@ -402,13 +433,12 @@ TAMIL_SUP = 'tamil_superscripted'
 TAMIL_SUB = 'tamil_subscripted'
 GRANTHA = 'grantha'
 TELUGU = 'telugu'
-SCHEMES = {
-}
-
 import os.path
 
+from indic_transliteration.sanscript.schemes import LazySchemeMap
 from indic_transliteration.sanscript.schemes import load_scheme
 
+SCHEMES = LazySchemeMap()
 data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "brahmic")
 for f in os.listdir(data_path):
   cls = BrahmicScheme
@@ -418,5 +448,4 @@ for f in os.listdir(data_path):
     cls = GurmukhiScheme
   elif f.startswith("tamil"):
     cls = TamilScheme
-  scheme = load_scheme(file_path=os.path.join(data_path, f), cls=cls)
-  SCHEMES[scheme.name] = scheme
+  SCHEMES.add_loader(f.replace(".toml", ""), functools.partial(load_scheme, file_path=os.path.join(data_path, f), cls=cls))
@@ -0,0 +1,514 @@
+"""
+Rules written for Devanagari text (lazy anusvaara fixes and such), applied to
+text in other schemes.
+
+Applying such a rule by transliterating the text to Devanagari and back costs
+two full transliterations. :class:`DevanagariRules` instead finds the tokens a
+rule acts on in the scheme's own text, reads the Devanagari of those tokens and
+their neighbours off the cached scheme maps, and replaces just those tokens.
+Where the transliteration itself would do more than map tokens (as with
+preprocessed scripts, or vedic accents next to yogavaahas), it falls back to
+the round trip. The standard form of Roman text (which is what the round trip
+alone makes of it) is found likewise.
+"""
+import functools
+import itertools
+
+import regex
+
+#: The consonant classes before which a lazy anusvaara stands for the nasal of
+#: the class, as in :meth:`DevanagariScheme.fix_lazy_anusvaara`.
+NASALS = [("क-ङ", "ङ"), ("च-ञ", "ञ"), ("त-न", "न"), ("ट-ण", "ण"), ("प-म", "म")]
+SEMIVOWELS = "यलव"
+
+#: How :meth:`Scheme.approximate_visargas` renders a visarga after each vowel.
+#: अ is deliberately placed in the end below.
+VISARGA_APPROXIMATIONS = [("आः", "आह"),
+                          ("इः", "इहि"),
+                          ("ईः", "ईहि"),
+                          ("उः", "उहु"),
+                          ("ऊः", "ऊहु"),
+                          ("ॠः", "ॠहि"),
+                          ("एः", "एहे"),
+                          ("ऐः", "एहि"),
+                          ("ओः", "ओहो"),
+                          ("औः", "औहु"),
+                          ("अः", "अह"),
+                          ]
+
+
+class _RoundTripNeeded(Exception):
+  """Raised where a rule can't be applied to the scheme's own text."""
+
+
+def approximate_visargas_in_devanagari(data):
+  from indic_transliteration import sanscript
+  vowel_to_mark_map = sanscript.SCHEMES[sanscript.DEVANAGARI].vowel_to_mark_map
+  for old, new in VISARGA_APPROXIMATIONS:
+    data = data.replace(old, new)
+    if not old.startswith("अ"):
+      old_mark = vowel_to_mark_map[old[0]]
+      data = data.replace(old.replace(old[0], old_mark), new.replace(old[0], old_mark))
+  # Only akAra+visarga should be left at this point.
+  return data.replace("ः", "ह")
+
+
+class DevanagariRules(object):
+  """Applies the Devanagari lazy anusvaara and visarga rules to text in
+  `scheme`, with the same results as transliterating the text to Devanagari,
+  applying the rule there and transliterating back - except that text the rule
+  does not touch is left as it is, rather than being normalized as a side
+  effect of the round trip.
+
+  :param scheme: a :class:`Scheme` in :data:`sanscript.SCHEMES`
+  """
+
+  def __init__(self, scheme):
+    from indic_transliteration import sanscript
+    self.scheme = scheme
+    self.to_devanagari = sanscript._get_scheme_map(scheme.name, sanscript.DEVANAGARI)
+    self.from_devanagari = sanscript._get_scheme_map(sanscript.DEVANAGARI, scheme.name)
+    scheme_map = self.to_devanagari
+    max_length = scheme_map.max_key_length_from_scheme
+    # The Devanagari of each token, with the tokens the transliterators split
+    # text into.
+    self.tokens = dict((x, y) for (x, y) in scheme_map.non_marks_viraama.items() if 0 < len(x) <= max_length)
+    if not scheme.is_roman:
+      for group_map in (scheme_map.virama, scheme_map.vowel_marks):
+        self.tokens.update((x, y) for (x, y) in group_map.items() if len(x) == 1)
+    self.token_trie = sanscript.SchemeMap._make_token_trie(self.tokens, max_length)
+    # Words are handled one at a time, which needs tokens to stay within them.
+    self.is_native = not any(character.isspace() for token in self.tokens for character in token)
+
+    tokens_for = self._tokens_for
+
+    def alternation(tokens):
+      return "|".join(regex.escape(x) for x in tokens)
+
+    self.anusvaaras = tokens_for("ं")
+    self.visargas = tokens_for("ः")
+    self._renderings = {}
+
+    # Checks for text that the transliteration would do more with.
+    self._round_trip_patterns = []
+    self._accent_pattern = None
+    if scheme.is_roman:
+      from indic_transliteration.sanscript.schemes import roman
+      # Accents (by themselves or within vowels) and the yogavaahas next to
+      # them are reordered - even with tokens for nothing in between.
+      accented = sorted((x for x in self.tokens if any(accent in self.tokens[x] for accent in scheme_map.accents.values())), key=len, reverse=True)
+      if accented:
+        yogavaahas = tokens_for(*sanscript.SCHEMES[sanscript.DEVANAGARI]["yogavaahas"])
+        empty = sorted((x for x in self.tokens if not self.tokens[x]), key=len, reverse=True)
+        gap = "(?:%s)*" % alternation(empty) if empty else ""
+        self._accent_pattern = regex.compile("(?:{1}){2}(?:{0})|(?<=(?:{0}){2})(?:{1})".format(alternation(accented), alternation(yogavaahas), gap))
+        # The pattern is slow to search for, and most text has no accents -
+        # which is quickly seen if each accented token has a character of
+        # its own.
+        other_characters = set(itertools.chain(*(x for x in self.tokens if x not in accented)))
+        accent_characters = [set(x) - other_characters for x in accented]
+        self._accent_characters = set().union(*accent_characters) if all(accent_characters) else None
+      if scheme.name in roman.CAPITALIZABLE_SCHEME_IDS:
+        # ओं and ओम् turn into ॐ.
+        self._round_trip_patterns.append(regex.compile(r"(?<=(^|\s|\p{Punct}))(?:%s)(?:%s)" % (alternation(tokens_for("ओ")), alternation(tokens_for("ं", "म")))))
+    if self.visargas:
+      self._visarga_word_pattern = regex.compile(r"(?<!\S)\S*?(?:%s)\S*" % alternation(self.visargas))
+    if self.anusvaaras:
+      self._anusvaara_pattern = regex.compile(alternation(self.anusvaaras))
+
+  def _tokens_for(self, *values):
+    """:return: the tokens for the Devanagari `values` - including the values
+             themselves where they are no tokens, since they are then left
+             as they are by the transliterator - longest first."""
+    tokens = [x for (x, y) in self.tokens.items() if y in values] + [x for x in values if x not in self.tokens]
+    return sorted(tokens, key=len, reverse=True)
+
+  def _token_at(self, text, position):
+    """:return: the longest token at `position` in `text`, or None"""
+    token = None
+    node = self.token_trie
+    for character in text[position:position + self.to_devanagari.max_key_length_from_scheme]:
+      node = node.get(character)
+      if node is None:
+        break
+      token = node.get(None, token)
+    return token
+
+  def _tokenize(self, text):
+    """Split `text` as the transliterator to Devanagari does.
+
+    :return: the list of tokens (or other characters), the Devanagari of each
+             one, and the Devanagari each one is transliterated to in place -
+             which differs from the former for Roman vowel marks and viramas.
+    """
+    tokens = []
+    values = []
+    outputs = []
+    scheme_map = self.to_devanagari
+    had_consonant = False
+    position = 0
+    while position < len(text):
+      token = self._token_at(text, position)
+      if token is None:
+        token = text[position]
+        value = output = token
+      else:
+        value = output = self.tokens[token]
+      if self.scheme.is_roman:
+        if had_consonant and token in scheme_map.vowels:
+          output = scheme_map.vowel_marks.get(token, "")
+        elif had_consonant:
+          output = scheme_map.virama[""] + output
+        had_consonant = token in scheme_map.consonants
+      tokens.append(token)
+      values.append(value)
+      outputs.append(output)
+      position += len(token)
+    return tokens, values, outputs
+
+  def _render(self, devanagari):
+    """:return: the Devanagari `devanagari` in this scheme, without shortcuts"""
+    rendering = self._renderings.get(devanagari)
+    if rendering is None:
+      from indic_transliteration.sanscript.brahmic_mapper import _brahmic
+      rendering = self._renderings[devanagari] = _brahmic(devanagari, self.from_devanagari)
+    return rendering
+
+  def _needs_round_trip(self, data):
+    if not self.is_native:
+      return True
+    for preprocess in self.to_devanagari.preprocessors:
+      if preprocess(data) != data:
+        return True
+    if self._accent_pattern is not None:
+      if self._accent_characters is None or any(x in data for x in self._accent_characters):
+        if self._accent_pattern.search(data):
+          return True
+    return any(pattern.search(data) for pattern in self._round_trip_patterns)
+
+  def round_trip(self, data, rewrite=None):
+    """Transliterate `data` to Devanagari, `rewrite` it there and transliterate it back."""
+    from indic_transliteration import sanscript
+    data = sanscript.transliterate(data, scheme_map=self.to_devanagari)
+    if rewrite is not None:
+      data = rewrite(data)
+    return sanscript.transliterate(data, scheme_map=self.from_devanagari)
+
+  def _apply(self, data_in, native_rule, devanagari_rule):
+    data = self.scheme.unapply_shortcuts(data_in=data_in)
+    if not self._needs_round_trip(data):
+      try:
+        return self.scheme.apply_shortcuts(data_in=native_rule(data))
+      except _RoundTripNeeded:
+        pass
+    return self.round_trip(data_in, devanagari_rule)
+
+  @functools.cached_property
+  def _standard_forms(self):
+    """:return: a pattern matching the tokens of a Roman scheme - and the token
+             sequences which are transliterated back as one, like j + ~n for
+             ज्ञ in OPTITRANS - a map from each of them to its standard form,
+             and a pattern for the text which still takes the round trip; or
+             None if the standard form of a token depends on what precedes it.
+    """
+    from indic_transliteration.sanscript.brahmic_mapper import _brahmic
+    from indic_transliteration.sanscript.roman_mapper import _roman
+    to_devanagari = self.to_devanagari
+
+    def round_trip(text):
+      return _brahmic(_roman(text, to_devanagari), self.from_devanagari)
+
+    standard_forms = dict((x, round_trip(x)) for x in self.tokens)
+    consonants = [x for x in self.tokens if x in to_devanagari.consonants]
+    if not consonants:
+      return None
+    for vowel in to_devanagari.vowels:
+      if vowel in self.tokens and round_trip(consonants[0] + vowel) != standard_forms[consonants[0]] + standard_forms[vowel]:
+        return None
+
+    virama = to_devanagari.virama[""]
+    for letter in self.from_devanagari.non_marks_viraama:
+      parts = letter.split(virama)
+      if len(parts) < 2 or len(letter) > self.from_devanagari.max_key_length_from_scheme:
+        continue
+      if "" in parts:
+        # The letter would depend on whether a vowel follows.
+        if any(self.tokens[x] == parts[-2] for x in consonants):
+          return None
+        continue
+      for sequence in itertools.product(*[[x for x in consonants if self.tokens[x] == part] for part in parts]):
+        spelling = "".join(sequence)
+        if spelling not in standard_forms and self._tokenize(spelling)[0] == list(sequence):
+          standard_forms[spelling] = round_trip(spelling)
+
+    def alternation(tokens):
+      return "|".join(regex.escape(x) for x in sorted(tokens, key=len, reverse=True))
+
+    # Only tokens which change need replacing, but those overlapping them are
+    # matched too, so that text is split into tokens as by the transliterator.
+    changing = [x for x in standard_forms if standard_forms[x] != x]
+    matched = self._with_overlapping_tokens(changing) if changing else set()
+    for x in matched:
+      standard_forms.setdefault(x, round_trip(x))
+
+    # Devanagari characters are left alone by the transliteration to
+    # Devanagari, but not by the one back.
+    token_characters = set(itertools.chain(*self.tokens))
+    devanagari_characters = set(itertools.chain(*self.from_devanagari.non_marks_viraama, *self.from_devanagari.vowel_marks, *self.from_devanagari.virama)) - token_characters
+    round_trip_patterns = ["[%s]" % regex.escape("".join(sorted(devanagari_characters)))] if devanagari_characters else []
+    # Tokens for vowel marks (rather than vowels) join the letter before them.
+    marks = [x for x in self.tokens if self.tokens[x][:1] in self.from_devanagari.vowel_marks or self.tokens[x][:1] in self.from_devanagari.virama]
+    if marks:
+      round_trip_patterns.append(alternation(marks))
+    round_trip_pattern = regex.compile("|".join(round_trip_patterns)) if round_trip_patterns else None
+    pattern = regex.compile(alternation(matched)) if matched else None
+    return pattern, dict((x, standard_forms[x]) for x in matched), round_trip_pattern
+
+  def get_standard_form(self, data_in):
+    """See :meth:`RomanScheme.get_standard_form`. Tokens are replaced by their
+    standard forms in a single pass, rather than by transliterating the text
+    to Devanagari and back."""
+    data = self.scheme.unapply_shortcuts(data_in=data_in)
+    if self._standard_forms is not None and not self._needs_round_trip(data):
+      pattern, standard_forms, round_trip_pattern = self._standard_forms
+      if round_trip_pattern is None or not round_trip_pattern.search(data):
+        if pattern is not None:
+          data = pattern.sub(lambda match: standard_forms[match.group()], data)
+        return self.scheme.apply_shortcuts(data_in=data)
+    return self.round_trip(data_in)
+
+  def leaves_words_alone(self, text):
+    """:return: whether the rules leave the words of `text` which they don't
+             act on as they are - rather than taking them through the round
+             trip, or rewriting their shortcuts."""
+    data = self.scheme.unapply_shortcuts(data_in=text)
+    return not self._needs_round_trip(data) and self.scheme.apply_shortcuts(data_in=data) == text
+
+  def fix_lazy_anusvaara(self, data_in, omit_sam=False, omit_yrl=False):
+    """See :meth:`Scheme.fix_lazy_anusvaara`. As with the Devanagari rule,
+    anusvaaras at the ends of words are left alone."""
+    from indic_transliteration import sanscript
+
+    def fix_word(word):
+      if not self.anusvaaras or not self._anusvaara_pattern.search(word):
+        return word
+      tokens, values, outputs = self._tokenize(word)
+      final_anusvaara = ""
+      if values[-1] == "ं":
+        final_anusvaara = tokens.pop()
+        values.pop()
+        outputs.pop()
+      elif outputs[-1].endswith("ं"):
+        raise _RoundTripNeeded()
+      if "ऽ" in values:
+        word = "".join(tokens)
+        tokens = self._swap_avagrahas(tokens, values)
+        if "".join(tokens) != word:
+          tokens, values, outputs = self._tokenize("".join(tokens))
+      devanagari = ""
+      for (index, value) in enumerate(values):
+        if value == "ं":
+          preceding = devanagari + outputs[index][:-1]
+          following = outputs[index + 1][:1] if index + 1 < len(values) else None
+          blocked = omit_sam and preceding.endswith("स")
+          nasal = None if blocked else self._nasal_for(following)
+          if nasal is not None:
+            tokens[index] = self._render(nasal + "्")
+          elif following is None:
+            tokens[index] = self._render("म्")
+          elif not omit_yrl and not blocked and following in SEMIVOWELS:
+            tokens[index] = self._render(following + "्ँ")
+        elif "ं" in value or "ं" in outputs[index]:
+          raise _RoundTripNeeded()
+        devanagari += outputs[index]
+      return "".join(tokens) + final_anusvaara
+
+    def fix(data):
+      lines_out = []
+      for line in data.split("\n"):
+        initial_space = "".join(itertools.takewhile(str.isspace, line))
+        final_space = "".join(itertools.takewhile(str.isspace, line[::-1]))
+        lines_out.append("%s%s%s" % (initial_space, " ".join(fix_word(word) for word in line.split()), final_space))
+      return "\n".join(lines_out)
+
+    return self._apply(data_in, fix, lambda data: sanscript.SCHEMES[sanscript.DEVANAGARI].fix_lazy_anusvaara(data_in=data, omit_sam=omit_sam, omit_yrl=omit_yrl))
+
+  @staticmethod
+  def _swap_avagrahas(tokens, values):
+    """Move avagrahas in front of the anusvaaras they follow - as ंऽ -> ऽं."""
+    tokens = list(tokens)
+    index = 0
+    while index + 1 < len(values):
+      if values[index] == "ं" and values[index + 1] == "ऽ":
+        tokens[index], tokens[index + 1] = tokens[index + 1], tokens[index]
+        index += 2
+      else:
+        index += 1
+    return tokens
+
+  @staticmethod
+  def _nasal_for(consonant):
+    if consonant:
+      for (consonants, nasal) in NASALS:
+        if consonants[0] <= consonant <= consonants[-1]:
+          return nasal
+    return None
+
+  @functools.cached_property
+  def _force_rules(self):
+    """:return: a pattern for :meth:`force_lazy_anusvaara`, and a map from the
+             heads it finds - the token sequences a rule may replace - to the
+             rule and the tokens of the head."""
+    virama = [] if self.scheme.is_roman else ["्"]
+    heads = {}
+
+    def add_heads(rule, *values):
+      parts = [self._tokens_for(value) for value in values]
+      for tokens in itertools.product(*parts):
+        heads["".join(tokens)] = (rule, tokens)
+
+    for (_, nasal) in NASALS:
+      add_heads(nasal, nasal, *virama)
+    for semivowel in SEMIVOWELS:
+      add_heads(SEMIVOWELS, semivowel, *virama, "ँ")
+    for anusvaara in self.anusvaaras:
+      heads[anusvaara] = ("ं", (anusvaara,))
+
+    # Tokens which a head may overlap are matched too, so that heads are only
+    # found where the transliterator would find their tokens.
+    alternatives = sorted(self._with_overlapping_tokens(heads), key=len, reverse=True)
+    return regex.compile("|".join(regex.escape(x) for x in alternatives)), heads
+
+  def _with_overlapping_tokens(self, tokens):
+    """:return: `tokens`, with all the tokens which may overlap them in some
+             text (and those which may overlap these, and so on)"""
+    def overlaps(token, other):
+      return other in token or any(other.startswith(token[i:]) for i in range(1, len(token)))
+
+    matched = set(tokens)
+    while True:
+      overlapping = set(x for x in self.tokens if x not in matched and any(overlaps(x, y) for y in matched))
+      if not overlapping:
+        return matched
+      matched.update(overlapping)
+
+  def force_lazy_anusvaara(self, data_in):
+    """See :meth:`Scheme.force_lazy_anusvaara`."""
+    from indic_transliteration import sanscript
+
+    def force(data):
+      pattern, heads = self._force_rules
+      # The Devanagari rules consume the consonant after a head, which is then
+      # not replaced by the same rule if it starts a head itself.
+      consumed_until = {}
+
+      def replace(match):
+        head = match.group()
+        if head not in heads:
+          return head
+        rule, head_tokens = heads[head]
+        start, end = match.span()
+        position = start
+        for token in head_tokens:
+          if (self._token_at(data, position) or data[position]) != token:
+            return head
+          position += len(token)
+        if rule == "ं":
+          if end == len(data) or (end == len(data) - 1 and data[-1] == "\n"):
+            return self._render("म्")
+          return head
+        position = end
+        while position < len(data) and data[position] == " ":
+          position += 1
+        token = self._token_at(data, position)
+        if token is None:
+          token = data[position:position + 1]
+          following = token
+        else:
+          following = self.tokens[token][:1]
+        if start < consumed_until.get(rule, 0) or not following:
+          return head
+        if rule == SEMIVOWELS:
+          applies = following in SEMIVOWELS
+        else:
+          applies = self._nasal_for(following) == rule
+        if not applies:
+          return head
+        consumed_until[rule] = position + len(token)
+        return self._render("ं")
+
+      return pattern.sub(replace, data)
+
+    return self._apply(data_in, force, lambda data: sanscript.SCHEMES[sanscript.DEVANAGARI].force_lazy_anusvaara(data_in=data))
+
+  def replace_terminal_anusvaara(self, data_in):
+    """See :meth:`Scheme.replace_terminal_anusvaara`."""
+    data = self.scheme.unapply_shortcuts(data_in=data_in)
+    if not self._needs_round_trip(data):
+      start = len(data)
+      while start > 0 and not data[start - 1].isspace():
+        start -= 1
+      tokens, values, outputs = self._tokenize(data[start:])
+      if not outputs or not outputs[-1].endswith("ं"):
+        return data_in
+      if values[-1] == "ं":
+        return self.scheme.apply_shortcuts(data_in=data[:len(data) - len(tokens[-1])] + self._render("म्"))
+    from indic_transliteration import sanscript
+    devanagari = sanscript.transliterate(data_in, scheme_map=self.to_devanagari)
+    if devanagari.endswith("ं"):
+      return sanscript.transliterate(devanagari[:-1] + "म्", scheme_map=self.from_devanagari)
+    return data_in
+
+  @functools.cached_property
+  def _visarga_approximations(self):
+    """:return: a map from the vowel or vowel mark before a visarga to what the
+             two turn into"""
+    from indic_transliteration import sanscript
+    vowel_to_mark_map = sanscript.SCHEMES[sanscript.DEVANAGARI].vowel_to_mark_map
+    approximations = {}
+    for old, new in VISARGA_APPROXIMATIONS:
+      approximations[old[0]] = new
+      if not old.startswith("अ"):
+        old_mark = vowel_to_mark_map[old[0]]
+        approximations[old_mark] = new.replace(old[0], old_mark)
+    return approximations
+
+  def approximate_visargas(self, data_in):
+    """See :meth:`Scheme.approximate_visargas` in the AHA mode."""
+    approximations = self._visarga_approximations
+
+    def approximate_in_word(match):
+      tokens, values, outputs = self._tokenize(match.group())
+      devanagari = ""
+      for (index, value) in enumerate(values):
+        if value == "ः":
+          preceding = (devanagari + outputs[index][:-1])[-1:]
+          new = approximations.get(preceding)
+          if preceding == "ः":
+            # The replacements would cascade.
+            raise _RoundTripNeeded()
+          if new is None:
+            tokens[index] = self._render("ह")
+          elif new.startswith(preceding):
+            tokens[index] = self._render(new[1:])
+          elif outputs[index - 1] == preceding and outputs[index] == "ः":
+            # The vowel changes too.
+            tokens[index - 1] = ""
+            tokens[index] = self._render(new)
+            if self.scheme.is_roman and preceding != values[index - 1]:
+              # A vowel mark turns into a vowel, which the transliterator
+              # precedes with an "a" after the consonant.
+              tokens[index] = "a" + tokens[index]
+          else:
+            raise _RoundTripNeeded()
+        elif "ः" in value or "ः" in outputs[index]:
+          raise _RoundTripNeeded()
+        devanagari += outputs[index]
+      return "".join(tokens)
+
+    def approximate(data):
+      if not self.visargas:
+        return data
+      return self._visarga_word_pattern.sub(approximate_in_word, data)
+
+    return self._apply(data_in, approximate, approximate_visargas_in_devanagari)
@@ -1,18 +1,12 @@
 import codecs
 import glob
+import hashlib
 import json
 import logging
 import os
-# Remove all handlers associated with the root logger object.
+import sys
 import toml
 
-for handler in logging.root.handlers[:]:
-  logging.root.removeHandler(handler)
-logging.basicConfig(
-  level=logging.DEBUG,
-  format="%(levelname)s:%(asctime)s:%(module)s:%(lineno)d %(message)s"
-)
-
 SCHEMES = {}
 
 def migrate(source_dir, dest_dir):
@@ -34,5 +28,71 @@ def migrate(source_dir, dest_dir):
         toml.dump(new_scheme, file_out)
 
 
+def validate_scheme(name, scheme):
+  """Check the structure of the data of a scheme.
+
+  :return: a list of problems found
+  """
+  if "vowels" not in scheme:
+    # Not a scheme (eg. _devanagari_vowel_to_marks.toml).
+    return []
+  problems = []
+  if "consonants" not in scheme:
+    problems.append("%s: no consonants" % name)
+  for group_name, group in scheme.items():
+    if group_name.startswith("_"):
+      # Comments
+      continue
+    if not isinstance(group, dict):
+      problems.append("%s: %s is not a table" % (name, group_name))
+      continue
+    for key, value in group.items():
+      if isinstance(value, list):
+        is_valid = all(isinstance(x, str) for x in value)
+      else:
+        is_valid = isinstance(value, str)
+      if not is_valid:
+        problems.append("%s: %s.%s is neither a string nor a list of strings" % (name, group_name, key))
+  return problems
+
+
+def compile_bundle(data_dir=os.path.join(os.path.dirname(__file__), "data"), bundle_path=os.path.join(os.path.dirname(__file__), "scheme_bundle.json")):
+  """Validate all the TOML files under `data_dir`, and compile them into a
+  single JSON file, which loads far faster than parsing them. Each file is
+  stored along with a hash of its content, so that it can be parsed afresh
+  once it changes (see `schemes.load_toml`).
+  """
+  files = {}
+  problems = []
+  for file_path in sorted(glob.glob(os.path.join(data_dir, "**/*.toml"), recursive=True)):
+    name = os.path.relpath(file_path, data_dir).replace(os.sep, "/")
+    with open(file_path, "rb") as file_in:
+      content = file_in.read()
+    try:
+      data = toml.loads(content.decode("utf-8"))
+    except (UnicodeDecodeError, toml.TomlDecodeError) as e:
+      problems.append("%s: %s" % (name, e))
+      continue
+    problems.extend(validate_scheme(name=name, scheme=data))
+    files[name] = {"sha256": hashlib.sha256(content).hexdigest(), "data": data}
+  if problems:
+    raise ValueError("Invalid scheme data:\n" + "\n".join(problems))
+  temp_path = bundle_path + ".tmp"
+  with codecs.open(temp_path, "w", 'utf-8') as file_out:
+    json.dump({"files": files}, file_out, ensure_ascii=False, separators=(",", ":"))
+  os.replace(temp_path, bundle_path)
+  logging.info("Compiled %d files into %s", len(files), bundle_path)
+
+
 if __name__ == '__main__':
-  migrate(source_dir=os.path.join(os.path.dirname(__file__), "data"), dest_dir=os.path.join(os.path.dirname(__file__), "toml"))
\ No newline at end of file
+  # Remove all handlers associated with the root logger object.
+  for handler in logging.root.handlers[:]:
+    logging.root.removeHandler(handler)
+  logging.basicConfig(
+    level=logging.DEBUG,
+    format="%(levelname)s:%(asctime)s:%(module)s:%(lineno)d %(message)s"
+  )
+  if sys.argv[1:] == ["compile"]:
+    compile_bundle()
+  else:
+    migrate(source_dir=os.path.join(os.path.dirname(__file__), "data"), dest_dir=os.path.join(os.path.dirname(__file__), "toml"))
\ No newline at end of file
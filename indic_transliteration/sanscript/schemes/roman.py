@@ -1,9 +1,13 @@
+import functools
 import os
 
 import regex
+from indic_transliteration.multi_replacer import MultiReplacer
+from indic_transliteration.rewrite_rules import RewriteRules
 from indic_transliteration.sanscript import Scheme
+from indic_transliteration.sanscript.schemes import LazySchemeMap
 from indic_transliteration.sanscript.schemes import load_scheme
-from indic_transliteration.sanscript.schemes import dev_vowel_to_mark_map
+from indic_transliteration.sanscript.schemes import get_dev_vowel_to_mark_map
 
 # Roman schemes
 # -------------
@@ -31,6 +35,7 @@ CAPITALIZABLE_SCHEME_IDS = ["iast", "iast_iso_m", "iso", "iso_vedic", "kolkata_v
 class RomanScheme(Scheme):
   def __init__(self, data=None, name=None, **kwargs):
     super(RomanScheme, self).__init__(data=data, name=name, is_roman=True)
+    dev_vowel_to_mark_map = get_dev_vowel_to_mark_map()
     self["vowel_marks"] = dict([(dev_vowel_to_mark_map[k], v) for k, v in self["vowels"].items() if k != "अ"])
     pass
 
@@ -41,9 +46,7 @@ class RomanScheme(Scheme):
     """
     if self["alternates"] is None:
       return data
-    from indic_transliteration import sanscript
-    return sanscript.transliterate(data=sanscript.transliterate(_from=self.name, _to=sanscript.DEVANAGARI, data=data),
-                                   _from=sanscript.DEVANAGARI, _to=self.name)
+    return self._devanagari_rules.get_standard_form(data)
 
   def get_double_lettered(self, text):
     text = self.get_standard_form(data=text)
@@ -65,23 +68,33 @@ class RomanScheme(Scheme):
 
 
 class ItransScheme(RomanScheme):
+  def _fixes_only_lazy_anusvaara_words(self, text):
+    return True
+
   def fix_lazy_anusvaara(self, data_in, omit_sam=False, omit_yrl=False, ignore_padaanta=True):
     if ignore_padaanta:
       return self.fix_lazy_anusvaara_except_padaantas(data_in=data_in, omit_sam=omit_sam, omit_yrl=omit_yrl)
-    data_out = data_in
-    import regex
-    if omit_sam:
-      prefix = "(?<!sa)"
-    else:
-      prefix = ""
-    data_out = regex.sub('%sM( *)([kgx])' % (prefix), r'~N\1\2', data_out)
-    data_out = regex.sub('%sM( *)([cCj])' % (prefix), r'~n\1\2', data_out)
-    data_out = regex.sub('%sM( *)([tdn])' % (prefix), r'n\1\2', data_out)
-    data_out = regex.sub('%sM( *)([TDN])' % (prefix), r'N\1\2', data_out)
-    data_out = regex.sub('%sM( *)([pb])' % (prefix), r'm\1\2', data_out)
-    if not omit_yrl:
-      data_out = regex.sub('%sM( *)([yvl])' % (prefix), r'\2.N\1\2', data_out)
-    return data_out
+    return _get_itrans_lazy_anusvaara_fixes(omit_sam=omit_sam, omit_yrl=omit_yrl).apply(data_in)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_itrans_lazy_anusvaara_fixes(omit_sam, omit_yrl):
+  """:return: the :class:`RewriteRules` for :meth:`ItransScheme.fix_lazy_anusvaara`"""
+  if omit_sam:
+    prefix = "(?<!sa)"
+  else:
+    prefix = ""
+  # Each rule starts at an M of its own, and leaves none behind.
+  rules = [
+    ('%sM( *)([kgx])' % (prefix), r'~N\1\2'),
+    ('%sM( *)([cCj])' % (prefix), r'~n\1\2'),
+    ('%sM( *)([tdn])' % (prefix), r'n\1\2'),
+    ('%sM( *)([TDN])' % (prefix), r'N\1\2'),
+    ('%sM( *)([pb])' % (prefix), r'm\1\2'),
+  ]
+  if not omit_yrl:
+    rules.append(('%sM( *)([yvl])' % (prefix), r'\2.N\1\2'))
+  return RewriteRules([rules])
 
 
 class OptitransScheme(RomanScheme):
@@ -99,20 +112,28 @@ class OptitransScheme(RomanScheme):
     text = text.lower()
     return text
 
+  @functools.cached_property
+  def _iso_urdu_replacers(self):
+    # Order matters below. Each stage is done in a single pass. A new stage
+    # starts wherever a replacement could be acted upon by a later one
+    # together with the text around it - for instance, once a deletion joins
+    # up the letters on either side.
+    stages = [
+      {"‘": "", "ʼ": "{}", "’": "{}"},
+      {"oo": "uu", "ee": "ii", "ë": "E", "ě": "E", "e": "ē", "o": "ō",
+       "ā": "aa", "ī": "ii", "ū": "uu", "w": "v",
+       "ẕ": "z", "ż": "z", "ẓ": "z", "ž": "z", "̌":""},
+      {"c̱ẖ": "ć", "chh": "ćh", "ch": "c", "ć": "c",
+       "ḳ": "q", "ṣ": "s"},
+      {"s̱ẖ": "sh", "s̱": "t", "ẖ": "h", "ḥ": "h", "̱": "", "̠": ""},
+      {"r̤i": "r̥", "̤": ""},
+    ]
+    return [MultiReplacer.from_passes(stage.items()) for stage in stages]
+
   def approximate_from_iso_urdu(self, text, add_terminal_a=True):
     # Arabic pattern = [؀-ۿ]
-    # Order matters below
-    replacements = {"‘": "", "ʼ": "{}", "’": "{}",
-                    "oo": "uu", "ee": "ii", "ë": "E", "ě": "E", "e": "ē", "o": "ō",
-                    "ā": "aa", "ī": "ii", "ū": "uu", "w": "v", 
-                    "ẕ": "z", "ż": "z", "ẓ": "z", "ž": "z", "̌":"",
-                    "c̱ẖ": "ć", "chh": "ćh", "ch": "c", "ć": "c", 
-                    "ḳ": "q", "ṣ": "s",
-                    "s̱ẖ": "sh", "s̱": "t", "ẖ": "h", "ḥ": "h", "̱": "", "̠": "", 
-                    "r̤i": "r̥", "̤": ""
-                    }
-    for key, value in replacements.items():
-      text = text.replace(key, value)
+    for replacer in self._iso_urdu_replacers:
+      text = replacer.replace(text)
     vowels_pattern = r'[aāeēiīoōuū]'
     text = regex.sub(r"(%s)'" % vowels_pattern, r"\1", text)
     text = regex.sub(r"'(%s)" % vowels_pattern, r"\1", text)
@@ -148,13 +169,16 @@ class CapitalizableScheme(RomanScheme):
       add_capitalized_synonyms(self["accented_vowel_alternates"].keys())
     add_capitalized_synonyms(["oṃ"])
 
+  @functools.cached_property
+  def _accent_before_mark_pattern(self):
+    return regex.compile("([%s])([̥̇¯̄]+)" % ("".join(self["accents"].values())))
+
   def get_standard_form(self, data):
-    pattern = "([%s])([̥̇¯̄]+)" % ("".join(self["accents"].values()))
-    data = regex.sub(pattern, "\\2\\1", data)
+    data = self._accent_before_mark_pattern.sub("\\2\\1", data)
     return super(CapitalizableScheme, self).get_standard_form(data=data)
 
 
-SCHEMES = {}
+SCHEMES = LazySchemeMap()
 data_path = os.path.join(os.path.dirname(__file__), "data", "roman")
 for f in os.listdir(data_path):
   cls = RomanScheme
@@ -165,7 +189,6 @@ for f in os.listdir(data_path):
     cls = ItransScheme
   elif name in CAPITALIZABLE_SCHEME_IDS:
     cls = CapitalizableScheme
-  scheme = load_scheme(file_path=os.path.join(data_path, f), cls=cls)
-  SCHEMES[scheme.name] = scheme
+  SCHEMES.add_loader(name, functools.partial(load_scheme, file_path=os.path.join(data_path, f), cls=cls))
 
 ALL_SCHEME_IDS = SCHEMES.keys()
@@ -1,41 +1,66 @@
-import regex
+import functools
+
+from indic_transliteration.rewrite_rules import RewriteRules
+
+SOFT_CONSONANTS = dict(zip("कचटतप", "गजडदब"))
+HARD_CONSONANTS = dict(zip("गजडदब", "कचटतप"))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_consonant_rules(pattern, replacements):
+  # The pattern may look at consonants changed by an earlier one, hence a stage each.
+  return RewriteRules([[(pattern.format(consonant), replacement)] for consonant, replacement in replacements])
+
 
 def soften(text, pattern):
-  text = regex.sub(pattern.format("क"), r"ग", text)
-  text = regex.sub(pattern.format("च"), r"ज", text)
-  text = regex.sub(pattern.format("ट"), r"ड", text)
-  text = regex.sub(pattern.format("त"), r"द", text)
-  text = regex.sub(pattern.format("प"), r"ब", text)
-  return text
+  return _get_consonant_rules(pattern, tuple(SOFT_CONSONANTS.items())).apply(text)
 
 
 def harden(text, pattern):
-  text = regex.sub(pattern.format("ग"), r"क", text)
-  text = regex.sub(pattern.format("ज"), r"च", text)
-  text = regex.sub(pattern.format("ड"), r"ट", text)
-  text = regex.sub(pattern.format("द"), r"त", text)
-  text = regex.sub(pattern.format("ब"), r"प", text)
-  return text
+  return _get_consonant_rules(pattern, tuple(HARD_CONSONANTS.items())).apply(text)
 
 
+def _consonant_rule(pattern, replacements):
+  """:return: a rule doing the work of :func:`soften` or :func:`harden` with
+           `pattern` in one go - which is only the same if `pattern` doesn't
+           look at the consonants themselves. Applied one at a time, the rules
+           of :func:`soften` or :func:`harden` are used instead."""
+  rules = [(pattern.format(consonant), replacement) for consonant, replacement in replacements.items()]
+  return (pattern.format("[%s]" % "".join(replacements)), lambda match: replacements[match.group()], rules)
+
+
+# Compare with https://github.com/virtualvinodh/aksharamukha-python/blob/5690ffb246e4c427bc937ed1cc3c7823ce37db10/aksharamukha/PreProcess.py#L1670
+_soft_consonant_settings = RewriteRules([[
+  _consonant_rule("(?<=[ऩ][ा-्]?)({})(?!्)", SOFT_CONSONANTS),
+  _consonant_rule("(?<=[ऱ][ा-ौ]?)({})(?!्)", SOFT_CONSONANTS),
+]])
+
 
 def set_tamil_soft_consonants(text):
-  # Compare with https://github.com/virtualvinodh/aksharamukha-python/blob/5690ffb246e4c427bc937ed1cc3c7823ce37db10/aksharamukha/PreProcess.py#L1670
-  text = soften(text=text, pattern="(?<=[ऩ][ा-्]?)({})(?!्)")
-  text = soften(text=text, pattern="(?<=[ऱ][ा-ौ]?)({})(?!्)")
+  text = _soft_consonant_settings.apply(text)
   # text = soften(text=text, pattern="(?<=[अ-औकचटतपयरलवशषसहळ][ा-ौ]?)({})(?!् *\\1)")
   return text
 
 
+# All but the last few rules can be applied together: none of them makes a
+# match for another. ेऩ is fixed only after न has become ऩ though.
+_naive_ta_transliteration_fixes = RewriteRules([
+  [
+    _consonant_rule("(?<=[ऩ][ा-्]?)({})(?=् )", HARD_CONSONANTS),
+    _consonant_rule("(?<=[ऱ][ा-ौ]?)({})(?=् )", HARD_CONSONANTS),
+    ("म्([सव])", r"ं\1"),
+    ("ट्र", r"ऱ्ऱ"),
+    ("ण्ड्र", r"ऩ्ऱ"),
+    ("न्न", r"ऩ्ऩ"),
+    ("न(्?)(?![ं-०])", r"ऩ\1"),
+  ],
+  [
+    ("ेऩ(?![ं-०])", r"ेन"), # प्रसादेन
+    ("न्ग(?!ळ)", "ऩ्ग"),
+    ("दिक(?=ळ)", "दिग"),
+  ],
+])
+
+
 def fix_naive_ta_transliterations(text):
-  text = harden(text=text, pattern="(?<=[ऩ][ा-्]?)({})(?=् )")
-  text = harden(text=text, pattern="(?<=[ऱ][ा-ौ]?)({})(?=् )")
-  text = regex.sub("म्([सव])", r"ं\1", text)
-  text = regex.sub("ट्र", r"ऱ्ऱ", text)
-  text = regex.sub("ण्ड्र", r"ऩ्ऱ", text)
-  text = regex.sub("न्न", r"ऩ्ऩ", text)
-  text = regex.sub("न(्?)(?![ं-०])", r"ऩ\1", text)
-  text = regex.sub("ेऩ(?![ं-०])", r"ेन", text) # प्रसादेन
-  text = regex.sub("न्ग(?!ळ)", "ऩ्ग", text)
-  text = regex.sub("दिक(?=ळ)", "दिग", text)
-  return text
+  return _naive_ta_transliteration_fixes.apply(text)
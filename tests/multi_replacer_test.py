@@ -0,0 +1,26 @@
+import pytest
+
+from indic_transliteration.multi_replacer import MultiReplacer
+
+
+def test_leftmost_longest():
+  replacer = MultiReplacer({"ch": "c", "chh": "ch", "h": "ḥ"})
+  assert replacer.replace("chha ch ha") == "cha c ḥa"
+
+
+def test_single_characters():
+  assert MultiReplacer({"a": "b", "b": "a", "x": ""}).replace("abx") == "ba"
+
+
+def test_from_passes():
+  passes = [("kh", "ch"), ("h", "ḥ"), ("k", "c")]
+  text = "khakh hk"
+  expected = text
+  for key, value in passes:
+    expected = expected.replace(key, value)
+  assert MultiReplacer.from_passes(passes).replace(text) == expected == "cḥacḥ ḥc"
+
+
+def test_empty_key():
+  with pytest.raises(ValueError):
+    MultiReplacer({"": "a"})
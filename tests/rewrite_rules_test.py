@@ -0,0 +1,55 @@
+import pytest
+import regex
+
+from indic_transliteration import tamil_tools
+from indic_transliteration.rewrite_rules import RewriteRules
+
+
+def test_stages():
+  rules = RewriteRules([
+    [("ंऽ", "ऽं")],
+    [("ं( *)([क-ङ])", r"ङ्\1\2"), ("ं( *)([प-म])", r"म्\1\2"), ("ं$", "म्")],
+  ])
+  assert rules.apply("संऽकल्पं पश्य कं") == "सऽङ्कल्पम् पश्य कम्"
+
+
+def test_same_as_sub_calls():
+  stage = [(r"(?<!sa)M( *)([kg])", r"~N\1\2"), (r"M( *)([pb])", lambda match: "m" + match.group(1) + match.group(2)), ("ai", "E")]
+  text = "saMkalpaM paraM gaccha M baila"
+  expected = text
+  for pattern, replacement in stage:
+    expected = regex.sub(pattern, replacement, expected)
+  assert RewriteRules([stage]).apply(text) == expected == "saMkalpam para~N gaccha m bEla"
+
+
+def test_group_references():
+  with pytest.raises(ValueError):
+    RewriteRules([[(r"(.)\1", ""), ("a", "b")]]).apply("aa")
+  assert RewriteRules([[(r"(.)\1", "")]]).apply("aab") == "b"
+
+
+def test_long_texts():
+  rules = RewriteRules([[("ं( *)([क-ङ])", r"ङ्\1\2"), ("ं$", "म्")]])
+  text = "संकल्पं कुरु " * 100 + "तं"
+  assert len(text) > RewriteRules.MERGED_SCAN_LENGTH_PER_RULE
+  assert rules.apply(text) == "सङ्कल्पङ् कुरु " * 100 + "तम्"
+
+
+def test_sequential_rules():
+  replacements = {"क": "ग", "च": "ज"}
+  rule = ("(?<=न)([कच])", lambda match: replacements[match.group()], [("(?<=न)(क)", "ग"), ("(?<=न)(च)", "ज")])
+  rules = RewriteRules([[rule]])
+  assert rules.apply("नक नच") == "नग नज"
+  assert rules.apply("नक नच " * 100) == "नग नज " * 100
+  # Long texts go through the rules with templates alone.
+  assert all(isinstance(replacement, str) for (_, _, passes) in rules._compiled_stages for (_, replacement) in passes)
+
+
+def test_tamil_normalizers():
+  # As soften and harden would, applied one consonant at a time.
+  text = "ऩकऱ्पन तन्न ऩगु ऱाक ऩ्दि ट्र ण्ड्र म्स प्रसादेन न्ग दिकळ ऩिप् ऱेत् "
+  expected = tamil_tools.soften(tamil_tools.soften(text, "(?<=[ऩ][ा-्]?)({})(?!्)"), "(?<=[ऱ][ा-ौ]?)({})(?!्)")
+  assert tamil_tools.set_tamil_soft_consonants(text) == expected
+  assert tamil_tools.set_tamil_soft_consonants(text * 50) == expected * 50
+  fixed = tamil_tools.fix_naive_ta_transliterations(text)
+  assert tamil_tools.fix_naive_ta_transliterations(text * 50) == fixed * 50
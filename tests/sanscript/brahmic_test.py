@@ -1,3 +1,5 @@
+import pytest
+
 from indic_transliteration import sanscript
 from indic_transliteration.sanscript.schemes import VisargaApproximation
 
@@ -97,3 +99,55 @@ def test_apply_roman_numerals():
 def test_dot_for_numeric_ids():
   devanagari_str = "हरि बोल १।३।५४ ६ ९को"
   assert sanscript.SCHEMES[sanscript.DEVANAGARI].dot_for_numeric_ids(devanagari_str) == "हरि बोल १.३.५४ ६ ९को"
+
+
+def test_brahmic_translation():
+  scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.DEVANAGARI], sanscript.SCHEMES[sanscript.KANNADA])
+  assert scheme_map.translation_table is not None
+  assert sanscript.transliterate("क्षेत्रज्ञः क़लम्", scheme_map=scheme_map) == "ಕ್ಷೇತ್ರಜ್ಞಃ ಕ಼ಲಮ್"
+  assert sanscript.transliterate("ಓಂ ನಮಃ", sanscript.KANNADA, sanscript.DEVANAGARI) == "ॐ नमः"
+
+
+def test_code_point_tables():
+  scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.DEVANAGARI], sanscript.SCHEMES[sanscript.OPTITRANS])
+  assert scheme_map.code_point_token_lengths[ord("ज") - scheme_map.code_point_offset] > 1
+  assert "ᳵ" in scheme_map.other_code_points
+  assert sanscript.transliterate("यज्ञः कᳵ x।", scheme_map=scheme_map) == "yajnaH kakH x|"
+  assert sanscript.transliterate("ಯಜ್ಞಃ । ಕ", sanscript.KANNADA, sanscript.OPTITRANS) == "yajnaH | ka"
+
+
+def test_non_token_runs():
+  scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.DEVANAGARI], sanscript.SCHEMES[sanscript.HK])
+  assert scheme_map._non_token_run_pattern.match("<a href='/x'>रा", 0).group() == "<a href='/x'>"
+  # A lingering consonant is ended before a run, as before a single character.
+  assert sanscript.transliterate("क<a href='/x'>रामः</a> 2024 क", scheme_map=scheme_map) == "ka<a href='/x'>rAmaH</a> 2024 ka"
+  assert sanscript.transliterate("rAm<{@}> k", sanscript.HK, sanscript.DEVANAGARI) == "राम्<{@}> क्"
+
+
+def test_brahmic_batch_translation():
+  pytest.importorskip("numpy")
+  texts = ["ಓಂ ನಮಃ", "ಕ್ಷೇತ್ರಜ್ಞಃ । x", "", "ಓ", "ಂ ಫ಼", "ಅಂಕ"]
+  for _to in [sanscript.DEVANAGARI, sanscript.TELUGU, sanscript.MALAYALAM]:
+    transliterator = sanscript.Transliterator(sanscript.KANNADA, _to)
+    assert transliterator.scheme_map.is_layout_compatible
+    assert transliterator.transliterate_batch(texts) == [transliterator(text) for text in texts]
+  assert not sanscript.SchemeMap(sanscript.SCHEMES[sanscript.DEVANAGARI], sanscript.SCHEMES[sanscript.TAMIL]).is_layout_compatible
+
+
+def test_replace_addak():
+  assert sanscript.transliterate("ਪੱਕਾ ਅੱਖ", sanscript.GURMUKHI, sanscript.DEVANAGARI) == "पक्का अक्ख"
+  assert sanscript.brahmic.GurmukhiScheme.replace_addak("ਸੱਚ ਅੱਖ ਮੱਲ") == "ਸਚ੍ਚ ਅਕ੍ਖ ਮਲ੍ਲ"
+  # Repeated addaks are resolved group by group.
+  assert sanscript.brahmic.GurmukhiScheme.replace_addak("ੱੱਜ ੱੱਕ") == "ੱਜ੍ਜ ੱਕ੍ਕ"
+  # Precomposed nukta letters are doubled; a bare nukta is not.
+  assert sanscript.transliterate("ਪੱ\u0a36ਾ ਕੱ\u0a5bਾ", sanscript.GURMUKHI, sanscript.DEVANAGARI) == "पश्शा क\u095b्\u095bा"
+  assert sanscript.brahmic.GurmukhiScheme.replace_addak("ਕੱ\u0a3c ਕੱ\u0a5e") == "ਕੱ\u0a3c ਕ\u0a5e੍\u0a5e"
+
+
+def test_fix_numbered_vargiiya_vyanjanas():
+  devanagari = sanscript.SCHEMES[sanscript.DEVANAGARI]
+  assert devanagari.fix_numbered_vargiiya_vyanjanas("ग³ज²ी प⁴ु क³⁴") == "गछी भु घ"
+
+
+def test_remove_svaras():
+  assert sanscript.SCHEMES[sanscript.DEVANAGARI].remove_svaras("अ॒ग्नि॑म् ई॒ळे१॒ पु॒रोहि॑तꣳ") == "अग्निम् ईळे पुरोहितं"
@@ -0,0 +1,52 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import indic_transliteration
+
+# Modules which transliteration doesn't need, and which are slow to import.
+DEFERRED_MODULES = ["tqdm", "toml", "json", "logging", "hashlib", "importlib.metadata", "selenium"]
+# A generous bound on the import time (in seconds; some 15 ms are usual),
+# which deferring them keeps well clear of.
+MAX_IMPORT_TIME = 0.2
+
+IMPORT_SCRIPT = """
+import sys
+from indic_transliteration import sanscript
+modules = sorted(sys.modules)
+import json
+print(json.dumps(modules))
+"""
+
+
+def test_import_budget():
+  # A fresh interpreter, since this one has imported everything already. It
+  # is run from the directory containing the package under test, so as to
+  # import that rather than any installed copy.
+  package_parent = os.path.dirname(os.path.dirname(os.path.abspath(indic_transliteration.__file__)))
+  output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=package_parent, check=True, capture_output=True, text=True).stdout
+  modules = json.loads(output)
+  assert [x for x in DEFERRED_MODULES if x in modules] == []
+
+
+def _get_import_time(package_parent):
+  """:return: the time taken to import the package (in seconds), as reported
+           by ``python -X importtime``"""
+  output = subprocess.run([sys.executable, "-X", "importtime", "-c", "from indic_transliteration import sanscript"], cwd=package_parent, check=True, capture_output=True, text=True).stderr
+  duration = 0
+  for line in output.splitlines():
+    # "import time: <self> | <cumulative> | <name>", where the names of
+    # nested imports are indented.
+    fields = line.split("|")
+    if len(fields) == 3 and fields[2].startswith(" indic_transliteration") and fields[1].strip().isdigit():
+      duration += int(fields[1])
+  return duration / 10 ** 6
+
+
+def test_import_time():
+  # The median of a few fresh interpreters, so as to be robust to noise.
+  package_parent = os.path.dirname(os.path.dirname(os.path.abspath(indic_transliteration.__file__)))
+  durations = [_get_import_time(package_parent) for _ in range(5)]
+  assert 0 < statistics.median(durations) < MAX_IMPORT_TIME
@@ -0,0 +1,37 @@
+import pytest
+import toml
+
+from indic_transliteration.sanscript import schemes
+from indic_transliteration.sanscript.schemes import migrator
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+  data_dir = tmp_path / "data"
+  (data_dir / "roman").mkdir(parents=True)
+  (data_dir / "roman" / "x.toml").write_text('[vowels]\n"अ" = "a"\n[consonants]\n"क" = ["k", "q"]\n', encoding="utf-8")
+  monkeypatch.setattr(schemes, "DATA_PATH", str(data_dir))
+  monkeypatch.setattr(schemes, "BUNDLE_PATH", str(tmp_path / "bundle.json"))
+  monkeypatch.setattr(schemes, "_bundle", None)
+  return data_dir
+
+
+def test_compile_bundle(data_dir, monkeypatch):
+  migrator.compile_bundle(data_dir=str(data_dir), bundle_path=schemes.BUNDLE_PATH)
+
+  def fail(*args, **kwargs):
+    raise AssertionError("The bundle was not used.")
+  monkeypatch.setattr(toml, "loads", fail)
+  assert schemes.load_toml(str(data_dir / "roman" / "x.toml")) == {"vowels": {"अ": "a"}, "consonants": {"क": ["k", "q"]}}
+
+
+def test_stale_bundle(data_dir):
+  migrator.compile_bundle(data_dir=str(data_dir), bundle_path=schemes.BUNDLE_PATH)
+  (data_dir / "roman" / "x.toml").write_text('[vowels]\n"अ" = "A"\n', encoding="utf-8")
+  assert schemes.load_toml(str(data_dir / "roman" / "x.toml")) == {"vowels": {"अ": "A"}}
+
+
+def test_compile_invalid_scheme(data_dir):
+  (data_dir / "roman" / "y.toml").write_text('[vowels]\n"अ" = 1\n', encoding="utf-8")
+  with pytest.raises(ValueError, match="roman/y.toml: no consonants\nroman/y.toml: vowels.अ is neither"):
+    migrator.compile_bundle(data_dir=str(data_dir), bundle_path=schemes.BUNDLE_PATH)
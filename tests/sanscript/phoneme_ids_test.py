@@ -0,0 +1,31 @@
+import pickle
+
+from indic_transliteration import sanscript
+from indic_transliteration.sanscript.phoneme_ids import PhonemeIds
+from indic_transliteration.sanscript.schemes import roman
+
+
+def test_render():
+  texts = ["क्षेत्रज्ञः रामः । ॐ\n", "ज़रा क़लम", "अग्निमी॑ळे पु॒रोहि॑तं", "ऴऩ x", "रामं॑ क", "क", ""]
+  targets = [sanscript.DEVANAGARI, sanscript.KANNADA, sanscript.TAMIL_SUP, sanscript.IAST, sanscript.OPTITRANS,
+             roman.SLP1_ACCENTED, sanscript.WX]
+  for text in texts:
+    ids = PhonemeIds.from_text(text)
+    assert ids.to_text() == text
+    for _to in targets:
+      assert ids.render(_to) == sanscript.transliterate(text, sanscript.DEVANAGARI, _to)
+
+
+def test_from_text():
+  ids = PhonemeIds.from_text("kSetrajJaH", sanscript.HK)
+  assert ids.ids.typecode == "H"
+  assert len(ids) == 7
+  assert ids.render(sanscript.IAST) == "kṣetrajñaḥ"
+  assert ids == PhonemeIds.from_text("क्षेत्रज्ञः")
+
+
+def test_pickle():
+  texts = [PhonemeIds.from_text(x) for x in ["रामः", "कृष्णः x"]]
+  loaded = pickle.loads(pickle.dumps(texts))
+  assert loaded == texts
+  assert loaded[1].render(sanscript.HK) == "kRSNaH x"
@@ -1,5 +1,9 @@
+import pytest
+
 from indic_transliteration import sanscript
+from indic_transliteration.sanscript.schemes import LazySchemeMap
 from indic_transliteration.sanscript.schemes import VisargaApproximation
+from indic_transliteration.sanscript.schemes import roman
 
 
 def test_fix_lazy_anusvaara_itrans():
@@ -21,10 +25,24 @@ def test_fix_lazy_anusvaara_slp():
   assert sanscript.SCHEMES[sanscript.SLP1].fix_lazy_anusvaara("aham") == "aham"
   assert sanscript.SCHEMES[sanscript.SLP1].fix_lazy_anusvaara("saMga") == "saNga"
   assert sanscript.SCHEMES[sanscript.SLP1].fix_lazy_anusvaara("saMga", omit_sam=True) == "saMga"
+  # Text in other scripts is left alone.
+  assert sanscript.SCHEMES[sanscript.SLP1].fix_lazy_anusvaara("saMga see https://x.org") == "saNga see https://x.org"
+
+
+def test_fix_lazy_anusvaara_except_padaantas_iast():
+  # Words are joined by single spaces, as ever.
+  assert sanscript.SCHEMES[sanscript.IAST].fix_lazy_anusvaara("grāmaṃ  gaccha\tsaṃjaya \n  \nsaṃkara") == "grāmaṃ gaccha sañjaya \n    \nsaṅkara"
+
+
+def test_force_lazy_anusvaara_roman():
+  assert sanscript.SCHEMES[sanscript.IAST].force_lazy_anusvaara("tantu") == "taṃtu"
+  assert sanscript.SCHEMES[sanscript.OPTITRANS].force_lazy_anusvaara("shankara x") == "shaMkara x"
+  assert sanscript.SCHEMES[sanscript.IAST].replace_terminal_anusvaara("rāmaṃ") == "rāmam"
 
 def test_approximate_visarga():
   assert sanscript.SCHEMES[sanscript.OPTITRANS].approximate_visargas("matiH", mode=VisargaApproximation.H) == "matih"
   assert sanscript.SCHEMES[sanscript.OPTITRANS].approximate_visargas("haraH", mode=VisargaApproximation.H) == "harah"
+  assert sanscript.SCHEMES[sanscript.OPTITRANS].approximate_visargas("matiH haraH", mode=VisargaApproximation.AHA) == "matihi haraha"
 
 
 def test_optitrans_to_lay_indian():
@@ -35,6 +53,10 @@ def test_optitrans_to_lay_indian():
 def test_get_standard_form():
   assert sanscript.SCHEMES[sanscript.IAST].get_standard_form("dŕ̥ṃhasva") == "dṛ́ṃhasva"
   assert sanscript.SCHEMES[sanscript.IAST].get_standard_form("pitŕ̥̄ṃs") == "pitṝ́ṃs"
+  assert sanscript.SCHEMES[sanscript.ITRANS].get_standard_form("sa.nskRRita x") == "saMskRRita kSh"
+  # Several tokens which make up one letter
+  assert sanscript.SCHEMES[sanscript.OPTITRANS].get_standard_form("j~nAnaM") == "jnAnaM"
+  assert sanscript.get_standard_form("sa.nskRRita", sanscript.ITRANS) == "saMskRRita"
 
 
 def test_to_double_lettered():
@@ -69,3 +91,45 @@ def test_optitrans_from_urdu():
   for source, dest in test_pairs.items():
     assert optitrans_scheme.approximate_from_iso_urdu(source) == dest, (source, dest)
   assert optitrans_scheme.approximate_from_iso_urdu("maẕhab", add_terminal_a=False) == "mazhab"
+
+
+def test_longest_token_match():
+  scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.ITRANS], sanscript.SCHEMES[sanscript.DEVANAGARI])
+  assert scheme_map.token_trie["k"]["S"]["h"][None] == "kSh"
+  assert sanscript.transliterate("kShetraj~na", scheme_map=scheme_map) == "क्षेत्रज्ञ"
+  assert sanscript.transliterate("LLIkSh", scheme_map=scheme_map) == "ॡक्ष्"
+
+
+def test_single_character_schemes():
+  assert sanscript.SCHEMES[sanscript.SLP1].is_single_character and sanscript.SCHEMES[sanscript.WX].is_single_character
+  assert not sanscript.SCHEMES[sanscript.HK].is_single_character
+  scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.SLP1], sanscript.SCHEMES[sanscript.DEVANAGARI])
+  assert "k0" in scheme_map.irregular_tokens and "kz" not in scheme_map.irregular_tokens
+  assert sanscript.transliterate("kzetrajYaH k0alam AUM ..", scheme_map=scheme_map) == "क्षेत्रज्ञः \u0958लम् ॐ ॥"
+  scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.SLP1], sanscript.SCHEMES[sanscript.WX])
+  assert scheme_map.translation_table is not None
+  assert sanscript.transliterate("rAmaH k0 x", scheme_map=scheme_map) == "rAmaH \u0958 L"
+
+
+def test_roman_direct_translation():
+  scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.HK], sanscript.SCHEMES[sanscript.IAST])
+  assert scheme_map.translation_table is not None
+  assert "kh" not in scheme_map.irregular_tokens and "RR" in scheme_map.irregular_tokens
+  assert sanscript.transliterate("kRSNaH kRRtam OM", scheme_map=scheme_map) == "kṛṣṇaḥ kṝtam oṃ"
+  # Accented vowels are written otherwise after a consonant.
+  scheme_map = sanscript.SchemeMap(sanscript.SCHEMES[sanscript.IAST], sanscript.SCHEMES[sanscript.HK])
+  assert "á" in scheme_map.irregular_tokens
+  assert sanscript.transliterate("agnímīḷe", scheme_map=scheme_map) == "agni\u0301mIlRe"
+  assert sanscript.transliterate("##rAmaH## rAmaH", sanscript.HK, sanscript.IAST, togglers={'##'}) == "rAmaH rāmaḥ"
+
+
+def test_lazy_scheme_map():
+  schemes = LazySchemeMap()
+  schemes.update_lazily(roman.SCHEMES)
+  schemes["custom"] = sanscript.SCHEMES["devanagari"]
+  assert "hk" in schemes and "custom" in schemes and "devanagari" not in schemes
+  assert len(schemes) == len(roman.SCHEMES) + 1
+  assert schemes["hk"] is roman.SCHEMES["hk"] is sanscript.SCHEMES["hk"]
+  del schemes["custom"]
+  with pytest.raises(KeyError):
+    schemes["custom"]
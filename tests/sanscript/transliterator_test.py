@@ -0,0 +1,146 @@
+import pickle
+
+import pytest
+
+from indic_transliteration import sanscript
+
+
+def test_transliterator():
+  to_devanagari = sanscript.Transliterator(sanscript.HK, sanscript.DEVANAGARI)
+  for text in ["rAmaH", "kSetrajJa", "", "x"]:
+    assert to_devanagari(text) == sanscript.transliterate(text, sanscript.HK, sanscript.DEVANAGARI)
+
+
+def test_transliterator_options():
+  transliterator = sanscript.Transliterator(sanscript.HK, sanscript.DEVANAGARI, togglers={'##'}, suspend_on=set('<'),
+                                            suspend_off=set('>'))
+  assert transliterator('<p>##na##ra## iti</p>') == '<p>naर iti</p>'
+  transliterator = sanscript.Transliterator(sanscript.KANNADA, sanscript.OPTITRANS, maybe_use_dravidian_variant="yes")
+  assert transliterator.scheme_map.to_scheme.name == sanscript.OPTITRANS_DRAVIDIAN
+
+
+def test_transliterator_pickle():
+  transliterator = sanscript.Transliterator(sanscript.DEVANAGARI, sanscript.IAST)
+  unpickled = pickle.loads(pickle.dumps(transliterator))
+  assert unpickled("रामः") == transliterator("रामः") == "rāmaḥ"
+
+
+def test_transliterate_many():
+  texts = ["rAmaH", "kRSNaH", "rAmaH", ""]
+  expected = [sanscript.transliterate(text, sanscript.HK, sanscript.DEVANAGARI) for text in texts]
+  assert sanscript.transliterate_many(texts, sanscript.HK, sanscript.DEVANAGARI) == expected
+  assert sanscript.transliterate_many(iter(texts), sanscript.HK, sanscript.DEVANAGARI, deduplicate=True) == expected
+  assert sanscript.transliterate_many(["रामः", "ರಾಮಃ"], _to=sanscript.IAST) == ["rāmaḥ", "rāmaḥ"]
+
+
+def test_iter_transliterate():
+  text = "kRSNa\nrAmaH\n\ngacchati vanam"
+  expected = sanscript.transliterate(text, sanscript.HK, sanscript.DEVANAGARI)
+  for chunk_size in [1, 2, 3, 5, 100]:
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    assert "".join(sanscript.iter_transliterate(chunks, sanscript.HK, sanscript.DEVANAGARI)) == expected
+
+
+def test_stream_transliterator():
+  stream = sanscript.StreamTransliterator(sanscript.DEVANAGARI, sanscript.IAST)
+  assert stream.feed("राम") == ""
+  assert stream.feed("ः\nक") == "rāmaḥ\n"
+  assert stream.flush() == "ka"
+  with pytest.raises(ValueError):
+    sanscript.StreamTransliterator(sanscript.HK, sanscript.DEVANAGARI, togglers={'##'})
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_transliterate_file(tmp_path, jobs):
+  text = "kRSNa\r\nrAmaH\n\ngacchati vanam\n" * 50 + "ante"
+  src = tmp_path / "src.txt"
+  dst = tmp_path / "dst.txt"
+  src.write_bytes(text.encode("utf-8"))
+  sanscript.transliterate_file(str(src), str(dst), sanscript.HK, sanscript.DEVANAGARI, jobs=jobs, chunk_size=64)
+  assert dst.read_bytes().decode("utf-8") == sanscript.transliterate(text, sanscript.HK, sanscript.DEVANAGARI)
+
+
+def test_transliterate_empty_file(tmp_path):
+  src = tmp_path / "src.txt"
+  dst = tmp_path / "dst.txt"
+  src.write_text("")
+  sanscript.transliterate_file(str(src), str(dst), sanscript.HK, sanscript.DEVANAGARI)
+  assert dst.read_text() == ""
+  # Toggle state would not carry across chunks.
+  with pytest.raises(ValueError):
+    sanscript.transliterate_file(str(src), str(dst), sanscript.HK, sanscript.DEVANAGARI, togglers={'##'})
+
+
+def test_scheme_map_cache():
+  cache = sanscript.SchemeMapCache(maxsize=2)
+  scheme_map = cache.get(sanscript.HK, sanscript.DEVANAGARI)
+  assert cache.get(sanscript.HK, sanscript.DEVANAGARI) is scheme_map
+  cache.pin(sanscript.HK, sanscript.DEVANAGARI)
+  cache.prewarm([(sanscript.HK, sanscript.IAST), (sanscript.HK, sanscript.KANNADA), (sanscript.HK, sanscript.TELUGU)])
+  info = cache.cache_info()
+  assert (info.hits, info.misses, info.evictions, info.currsize, info.pinned) == (2, 4, 1, 3, 1)
+  assert cache.get(sanscript.HK, sanscript.DEVANAGARI) is scheme_map
+
+  cache.unpin(sanscript.HK, sanscript.DEVANAGARI)
+  cache.resize(1)
+  assert cache.cache_info().currsize == 1
+  assert cache.get(sanscript.HK, sanscript.DEVANAGARI) is scheme_map
+  cache.clear()
+  assert cache.cache_info() == sanscript.SchemeMapCacheInfo(0, 0, 0, 1, 0, 0)
+
+
+def test_cache_size_from_environment(monkeypatch):
+  variable = "INDIC_TRANSLITERATION_SCHEME_MAP_CACHE_SIZE"
+  monkeypatch.delenv(variable, raising=False)
+  assert sanscript._get_cache_size(variable, 64) == 64
+  for value, size in [("128", 128), ("0", None), (" None ", None), ("lots", 64), ("-1", 64)]:
+    monkeypatch.setenv(variable, value)
+    assert sanscript._get_cache_size(variable, 64) == size
+
+
+def test_scheme_map_cache_directory(tmp_path):
+  cache = sanscript.SchemeMapCache(directory=str(tmp_path))
+  scheme_map = cache.get(sanscript.DEVANAGARI, sanscript.KANNADA)
+  loaded_map = sanscript.SchemeMapCache(directory=str(tmp_path)).get(sanscript.DEVANAGARI, sanscript.KANNADA)
+  assert loaded_map is not scheme_map
+  assert loaded_map.from_scheme is sanscript.SCHEMES[sanscript.DEVANAGARI]
+  assert sanscript.transliterate("राम॑ः कृष्णः", scheme_map=loaded_map) == sanscript.transliterate("राम॑ः कृष्णः", scheme_map=scheme_map)
+  # Unreadable files are rebuilt.
+  cache = sanscript.SchemeMapCache(directory=str(tmp_path))
+  with open(cache._get_path((sanscript.DEVANAGARI, sanscript.KANNADA)), "wb") as f:
+    f.write(b"\x80\x05garbage")
+  assert cache.get(sanscript.DEVANAGARI, sanscript.KANNADA).from_scheme is sanscript.SCHEMES[sanscript.DEVANAGARI]
+
+
+def test_word_cache():
+  cache = sanscript.WordCache(maxsize=2)
+  text = "rAmo rAmo rAmaH\tkRSNaH \n"
+  expected = sanscript.transliterate(text, sanscript.HK, sanscript.DEVANAGARI)
+  assert sanscript.transliterate(text, sanscript.HK, sanscript.DEVANAGARI, memoize_words=cache) == expected
+  info = cache.cache_info()
+  assert (info.hits, info.misses, info.evictions, info.currsize) == (1, 3, 1, 2)
+  assert cache.hit_rate == 0.25
+
+  transliterator = sanscript.Transliterator(sanscript.HK, sanscript.DEVANAGARI, memoize_words=cache)
+  assert transliterator(text) == pickle.loads(pickle.dumps(transliterator))(text) == expected
+  # With togglers, words aren't looked up.
+  assert sanscript.transliterate("##rAmaH## rAmaH", sanscript.HK, sanscript.DEVANAGARI, memoize_words=cache, togglers={'##'}) == "rAmaH रामः"
+  cache.resize(max_memory=0)
+  assert cache.cache_info().currsize == 0
+  cache.clear()
+  assert cache.cache_info() == sanscript.WordCacheInfo(0, 0, 0, 2, 0, 0, 0)
+
+
+def test_transliterate_to_many():
+  targets = [sanscript.DEVANAGARI, sanscript.KANNADA, sanscript.IAST, sanscript.OPTITRANS, sanscript.TAMIL_SUP]
+  for _from, text in [(sanscript.HK, "kSetrajJaH rAmaH | OM\n"), (sanscript.DEVANAGARI, "क्षेत्रज्ञः रामः । ॐ\n"), (sanscript.ITRANS, "ku~njaM")]:
+    expected = dict((_to, sanscript.transliterate(text, _from, _to)) for _to in targets)
+    assert sanscript.transliterate_to_many(text, _from, targets) == expected
+  assert sanscript.transliterate_to_many("##rAmaH## rAmaH", sanscript.HK, [sanscript.IAST], togglers={'##'}) == {sanscript.IAST: "rAmaH rāmaḥ"}
+  # Options are accepted or rejected as by transliterate.
+  targets = [sanscript.IAST, sanscript.KANNADA]
+  expected = dict((_to, sanscript.transliterate("रामः", sanscript.DEVANAGARI, _to, togglers={'##'})) for _to in targets)
+  assert sanscript.transliterate_to_many("रामः", sanscript.DEVANAGARI, targets, togglers={'##'}) == expected
+  assert sanscript.transliterate_to_many("rAmaH", sanscript.HK, [sanscript.IAST], togglers=set()) == {sanscript.IAST: "rāmaḥ"}
+  with pytest.raises(TypeError):
+    sanscript.transliterate_to_many("rAmaH", sanscript.HK, [sanscript.IAST], unknown_option=True)